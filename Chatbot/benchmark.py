@@ -0,0 +1,286 @@
+import argparse
+import json
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import threading
+import time
+from difflib import get_close_matches
+
+from db import ConnectionManager
+from engine import search_query
+from intent_index import IntentIndex
+from populate_database import build_search_index, bulk_load, create_tables, open_for_bulk_load
+from semantic_index import SemanticIndex, load_numpy
+from session_store import SessionStore
+
+
+# Build a random lowercase word
+def random_word(rng, min_len=3, max_len=10):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(min_len, max_len)))
+
+
+# Build a list of unique synthetic intent keys
+def synthetic_intents(count, seed=0):
+    rng = random.Random(seed)
+    intents = set()
+    while len(intents) < count:
+        intents.add(" ".join(random_word(rng) for _ in range(rng.randint(1, 3))))
+    return sorted(intents)
+
+
+# Build queries that are typos of known intents, mixed with unknown text
+def synthetic_queries(intents, count, seed=1):
+    rng = random.Random(seed)
+    queries = []
+    for i in range(count):
+        if i % 2:
+            queries.append(random_word(rng, 8, 24))
+            continue
+        chars = list(rng.choice(intents))
+        chars[rng.randrange(len(chars))] = rng.choice(string.ascii_lowercase)
+        queries.append("".join(chars))
+    return queries
+
+
+# Time a matcher over the queries and return milliseconds per message
+def time_per_message(matcher, queries):
+    start = time.perf_counter()
+    for query in queries:
+        matcher(query)
+    return (time.perf_counter() - start) * 1000 / len(queries)
+
+
+# Compare the trigram index against a full difflib scan
+def bench_intents(args):
+    print(f"{'intents':>8} | {'difflib ms/msg':>14} | {'index ms/msg':>12} | {'build ms':>8} | agree")
+    for size in args.sizes:
+        intents = synthetic_intents(size)
+        queries = synthetic_queries(intents, args.queries)
+        start = time.perf_counter()
+        index = IntentIndex(intents)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        def scan(query):
+            matches = get_close_matches(query, intents, n=1, cutoff=0.8)
+            return matches[0] if matches else None
+
+        # difflib is too slow to replay every query against the largest tables
+        scan_queries = queries[:max(10, args.queries * 1000 // size)]
+        scan_ms = time_per_message(scan, scan_queries)
+        index_ms = time_per_message(index.closest, queries)
+        agree = sum(scan(q) == index.closest(q) for q in scan_queries)
+        print(f"{size:>8} | {scan_ms:>14.3f} | {index_ms:>12.3f} | {build_ms:>8.1f} | "
+              f"{agree}/{len(scan_queries)}")
+
+
+# Time TF-IDF intent classification for single messages and batches
+def bench_semantic(args):
+    rng = random.Random(4)
+    vocabulary = [random_word(rng, 4, 9) for _ in range(args.vocabulary)]
+    backend = "NumPy" if load_numpy() is not None else "pure Python"
+    print(f"Backend: {backend}")
+    print(f"{'intents':>8} | {'build ms':>8} | {'ms/msg':>8} | {'batch ms/msg':>12}")
+    for size in args.sizes:
+        intents = [(i, " ".join(rng.choices(vocabulary, k=12))) for i in range(size)]
+        queries = [" ".join(rng.choices(vocabulary, k=5)) for _ in range(args.queries)]
+        start = time.perf_counter()
+        index = SemanticIndex(intents)
+        build_ms = (time.perf_counter() - start) * 1000
+        single_ms = time_per_message(index.best, queries)
+        start = time.perf_counter()
+        index.best_batch(queries)
+        batch_ms = (time.perf_counter() - start) * 1000 / len(queries)
+        print(f"{size:>8} | {build_ms:>8.1f} | {single_ms:>8.3f} | {batch_ms:>12.3f}")
+
+
+# Build a database with a synthetic info table and its search index
+def synthetic_database(path, rows, seed=2):
+    rng = random.Random(seed)
+    vocabulary = [random_word(rng, 4, 9) for _ in range(5000)]
+    conn = sqlite3.connect(path)
+    create_tables(conn)
+    conn.executemany(
+        "INSERT INTO info (topic, details) VALUES (?, ?)",
+        ((f"topic{i} {rng.choice(vocabulary)}", " ".join(rng.choices(vocabulary, k=15)))
+         for i in range(rows)))
+    build_search_index(conn)
+    conn.commit()
+    return conn, vocabulary
+
+
+# Compare exact lookups, FTS5 MATCH and a LIKE scan over a large info table
+def bench_search(args):
+    rng = random.Random(3)
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        conn, vocabulary = synthetic_database(os.path.join(tmp, "info.db"), args.rows)
+        print(f"Built {args.rows} rows and the FTS index in {time.perf_counter() - start:.1f}s")
+        topics = [row[0] for row in conn.execute(
+            "SELECT topic FROM info ORDER BY random() LIMIT ?", (args.queries,))]
+        questions = [f"what about {rng.choice(vocabulary)} and {rng.choice(vocabulary)}?"
+                     for _ in range(args.queries)]
+
+        def exact(topic):
+            return conn.execute("SELECT details FROM info WHERE topic = ?", (topic,)).fetchone()
+
+        def search(question):
+            return conn.execute("SELECT details FROM info_fts WHERE info_fts MATCH ? "
+                                "ORDER BY bm25(info_fts, 10.0, 1.0) LIMIT 1",
+                                (search_query(question),)).fetchone()
+
+        # Without an index every row has to be scanned to find all candidates
+        def like_scan(question):
+            words = question.rstrip("?").split()
+            return conn.execute("SELECT details FROM info WHERE details LIKE ? OR details LIKE ?",
+                                (f"%{words[2]}%", f"%{words[4]}%")).fetchall()
+
+        print(f"Exact topic lookup: {time_per_message(exact, topics):.3f} ms/query")
+        print(f"FTS5 BM25 search:   {time_per_message(search, questions):.3f} ms/query")
+        print(f"LIKE scan:          {time_per_message(like_scan, questions[:20]):.3f} ms/query")
+        conn.close()
+
+
+# Run parallel readers against the database while populate_database.py loads into it
+def bench_stress(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "info.db")
+        conn, vocabulary = synthetic_database(path, args.rows)
+        conn.close()
+        db = ConnectionManager(path)
+        stop = threading.Event()
+        errors = []
+        reads = [0] * args.readers
+
+        def reader(slot):
+            rng = random.Random(slot)
+            try:
+                while not stop.is_set():
+                    conn = db.reader()
+                    conn.execute("SELECT details FROM info WHERE topic = ?",
+                                 (f"topic{rng.randrange(args.rows)}",)).fetchone()
+                    conn.execute("SELECT details FROM info_fts WHERE info_fts MATCH ? LIMIT 1",
+                                 (search_query(rng.choice(vocabulary)),)).fetchone()
+                    reads[slot] += 1
+            except sqlite3.Error as e:
+                errors.append(f"reader {slot}: {e}")
+
+        def writer():
+            rng = random.Random(99)
+            try:
+                conn = open_for_bulk_load(path)
+                for round_number in range(args.write_rounds):
+                    rows = ((f"topic{rng.randrange(args.rows)}", f"updated in round {round_number}")
+                            for _ in range(args.rows // 10))
+                    bulk_load(conn, rows, batch_size=1000, transaction_size=5000)
+                conn.execute("BEGIN")
+                build_search_index(conn)
+                conn.execute("COMMIT")
+                conn.close()
+            except sqlite3.Error as e:
+                errors.append(f"writer: {e}")
+
+        threads = [threading.Thread(target=reader, args=(slot,)) for slot in range(args.readers)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        writer()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        db.close()
+
+    print(f"{args.readers} readers did {sum(reads)} lookups in {elapsed:.1f}s "
+          f"while {args.write_rounds} bulk loads ran")
+    if errors:
+        print(f"FAILED with {len(errors)} errors:")
+        for error in errors[:10]:
+            print(f"  {error}")
+        raise SystemExit(1)
+    print("No database errors.")
+
+
+# Time preference lookups and updates with many stored users
+def bench_sessions(args):
+    rng = random.Random(5)
+    with tempfile.TemporaryDirectory() as tmp:
+        store = SessionStore(os.path.join(tmp, "prefs.db"), legacy_file=None)
+        start = time.perf_counter()
+        store.save_many((f"student{i}", f"Student{i}", "Alex") for i in range(args.users))
+        # In WAL mode the new rows sit in prefs.db-wal until they are checkpointed
+        store.checkpoint()
+        print(f"Stored {args.users} users in {time.perf_counter() - start:.1f}s, "
+              f"{os.path.getsize(store.path) / args.users:.0f} bytes/user")
+
+        keys = [f"student{rng.randrange(args.users)}" for _ in range(args.operations)]
+        print(f"Restore on reconnect: {time_per_message(store.get, keys):.4f} ms/user")
+        print(f"Save one user:        {time_per_message(lambda key: store.save(key, key, 'Jordan'), keys):.4f} ms/user")
+
+        errors = []
+
+        def writer(slot):
+            try:
+                for key in keys[slot::args.threads]:
+                    store.save(key, key, "Riley")
+            except sqlite3.Error as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=writer, args=(slot,)) for slot in range(args.threads)]
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+        print(f"{args.threads} concurrent writers: {len(keys) / elapsed:.0f} saves/sec, {len(errors)} errors")
+        store.close()
+
+        # What a single JSON file would cost on every update
+        data = {f"student{i}": {"user_name": f"Student{i}", "last_agent": "Alex"} for i in range(args.users)}
+        start = time.perf_counter()
+        with open(os.path.join(tmp, "prefs.json"), "w") as file:
+            json.dump(data, file)
+        print(f"Rewriting one JSON file instead: {(time.perf_counter() - start) * 1000:.0f} ms/update")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Chatbot performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    intents_parser = subparsers.add_parser("intents", help="close-match lookup latency")
+    intents_parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 50000])
+    intents_parser.add_argument("--queries", type=int, default=200)
+    intents_parser.set_defaults(func=bench_intents)
+
+    semantic_parser = subparsers.add_parser("semantic", help="TF-IDF intent classification latency")
+    semantic_parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    semantic_parser.add_argument("--vocabulary", type=int, default=3000)
+    semantic_parser.add_argument("--queries", type=int, default=1000)
+    semantic_parser.set_defaults(func=bench_semantic)
+
+    search_parser = subparsers.add_parser("search", help="database lookups on a large info table")
+    search_parser.add_argument("--rows", type=int, default=100000)
+    search_parser.add_argument("--queries", type=int, default=500)
+    search_parser.set_defaults(func=bench_search)
+
+    sessions_parser = subparsers.add_parser("sessions", help="session store at a large number of users")
+    sessions_parser.add_argument("--users", type=int, default=1000000)
+    sessions_parser.add_argument("--operations", type=int, default=5000)
+    sessions_parser.add_argument("--threads", type=int, default=8)
+    sessions_parser.set_defaults(func=bench_sessions)
+
+    stress_parser = subparsers.add_parser("stress", help="parallel reads during a concurrent populate")
+    stress_parser.add_argument("--rows", type=int, default=20000)
+    stress_parser.add_argument("--readers", type=int, default=8)
+    stress_parser.add_argument("--write-rounds", type=int, default=5)
+    stress_parser.set_defaults(func=bench_stress)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import threading
+from urllib.parse import quote
+
+# Directory holding the chatbot's data files
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+# Resolve a data file relative to the chatbot package instead of the CWD
+def resolve_path(filename):
+    return filename if os.path.isabs(filename) else os.path.join(BASE_DIR, filename)
+
+
+class ConnectionManager:
+    """Hand out one read-only SQLite connection per thread.
+
+    The database is switched to WAL on startup so readers never block each
+    other or a concurrent populate_database.py run. Each connection keeps
+    its own prepared-statement cache.
+    """
+
+    def __init__(self, path='university_info.db', timeout=5.0, cached_statements=256):
+        self.path = resolve_path(path)
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        self._prepare()
+
+    def _prepare(self):
+        # Kept open until close() so that the last connection to go is a
+        # writable one, which checkpoints and removes the WAL files
+        self.owner = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+        self.owner.execute("PRAGMA journal_mode = WAL")
+        self.owner.execute('''CREATE TABLE IF NOT EXISTS info (
+                                  topic TEXT PRIMARY KEY,
+                                  details TEXT
+                              )''')
+        self.owner.commit()
+
+    def connect(self):
+        """Open a new read-only connection that the caller may share under its own lock."""
+        conn = sqlite3.connect(f"file:{quote(self.path)}?mode=ro", uri=True, timeout=self.timeout,
+                               cached_statements=self.cached_statements, check_same_thread=False)
+        with self.lock:
+            self.connections.append(conn)
+        return conn
+
+    def reader(self):
+        """Return the calling thread's read-only connection."""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = self.local.conn = self.connect()
+        return conn
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+        self.local = threading.local()
+        self.owner.close()
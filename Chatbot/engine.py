@@ -0,0 +1,309 @@
+import random
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from db import ConnectionManager, resolve_path
+from response_set import ResponseSet
+from topic_cache import TopicCache
+
+# Agent names a session can be assigned
+AGENTS = ["Alex", "Jordan", "Taylor", "Morgan", "Casey", "Jamie", "Riley", "Avery"]
+
+# Messages that end the conversation
+EXIT_WORDS = ["bye", "exit", "quit", "see you later", "goodbye"]
+
+# Words ignored when searching the database
+STOP_WORDS = {
+    "a", "about", "am", "an", "and", "any", "are", "at", "be", "can", "do", "does", "for",
+    "from", "get", "have", "how", "i", "in", "is", "it", "me", "my", "of", "on", "or",
+    "please", "so", "tell", "the", "there", "to", "what", "when", "where", "which", "who",
+    "why", "will", "with", "you", "your",
+}
+
+
+# Normalize a message so that trivially different inputs share a cache entry
+def normalize_text(text):
+    return " ".join(text.lower().split())
+
+
+# Smallest BM25 relevance (negated bm25() with the topic weighted 10x) a search hit needs;
+# a word in a row's topic clears it, a word common to many rows or only seen in passing does not
+MIN_SEARCH_SCORE = 2.0
+
+
+# Build an FTS5 query that matches any (or, with operator="AND", every) meaningful word of the message
+def search_query(text, operator="OR"):
+    terms = [word for word in re.findall(r"[a-z0-9]+", text.lower()) if word not in STOP_WORDS]
+    # Prefix queries so that "hostel" also finds "hostels"
+    return f" {operator} ".join(f'"{term}"*' for term in dict.fromkeys(terms))
+
+
+# Sentiment polarity of a normalized message
+def sentiment_polarity(text):
+    # Imported here because textblob is slow to import and rarely needed
+    from textblob import TextBlob
+    return TextBlob(text).sentiment.polarity
+
+
+# Function to get a random agent name
+def get_agent_name():
+    return random.choice(AGENTS)
+
+
+class Session:
+    """Conversation state for a single user."""
+
+    def __init__(self, user_name='', agent_name=None):
+        self.user_name = user_name
+        self.agent_name = agent_name or get_agent_name()
+        self.awaiting_feedback = False
+        self.closed = False
+
+
+class Message:
+    """One incoming message as it passes through the response stages."""
+
+    __slots__ = ("text", "lower", "user_name", "response_set")
+
+    def __init__(self, text, user_name, response_set):
+        self.text = text
+        self.lower = text.lower()
+        self.user_name = user_name
+        self.response_set = response_set
+
+
+class ResponseEngine:
+    """Response tables, database handle and matching logic, without any GUI."""
+
+    def __init__(self, responses_file='responses.json', db_path='university_info.db',
+                 disconnect_rate=0.05, sentiment_cache_size=4096, metrics=None,
+                 semantic_threshold=0.3, max_semantic_topics=5000, session_store=None):
+        self.responses_file = resolve_path(responses_file)
+        self.disconnect_rate = disconnect_rate
+        # Optional metrics.Metrics that records stage timings and counters
+        self.metrics = metrics
+        self.semantic_threshold = semantic_threshold
+        # Optional session_store.SessionStore that remembers users between visits
+        self.session_store = session_store
+        self.max_semantic_topics = max_semantic_topics
+        self.polarity = lru_cache(maxsize=sentiment_cache_size)(sentiment_polarity)
+        # Engine-wide counters, shared by every worker thread answering messages
+        self.stats_lock = threading.Lock()
+        self.messages_answered = 0
+        self.sentiment_needed = 0
+        self.db = ConnectionManager(db_path)
+        self.has_search_index = self.db.reader().execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'info_fts'").fetchone() is not None
+        # The cache gets its own connection so that data_version stays comparable
+        self.topic_cache = TopicCache(self.db.connect(), threading.Lock())
+        self.response_set = self.load_response_set()
+        # Stages are tried in order until one of them produces a reply
+        self.stages = [
+            ("database", self.database_stage),
+            ("keywords", self.keyword_stage),
+            ("exact", self.exact_stage),
+            ("close_match", self.close_match_stage),
+            ("semantic", self.semantic_stage),
+            ("search", self.search_stage),
+            ("sentiment", self.sentiment_stage),
+            ("fallback", self.fallback_stage),
+        ]
+
+    def load_response_set(self):
+        """Parse responses.json and index it together with the info table.
+
+        Only the first max_semantic_topics topics in load order (rowid) are
+        classified semantically; the rest are still answered by the exact
+        topic lookup and the full-text search stage.
+        """
+        info_rows = self.db.reader().execute(
+            "SELECT topic, details FROM info ORDER BY rowid LIMIT ?", (self.max_semantic_topics,)).fetchall()
+        return ResponseSet.from_file(self.responses_file, info_rows, STOP_WORDS)
+
+    def reload_responses(self):
+        """Re-read responses.json, swap in the new snapshot and drop cached topics."""
+        response_set = self.load_response_set()
+        # A single assignment, so no message sees a mix of old and new tables
+        self.response_set = response_set
+        self.topic_cache.invalidate()
+
+    def close(self):
+        self.db.close()
+        if self.session_store is not None:
+            self.session_store.close()
+
+    def new_session(self, user_name=''):
+        return Session(user_name)
+
+    def identify(self, session, user_name):
+        """Set the session's user and restore the agent they last chatted with."""
+        session.user_name = user_name
+        if self.session_store is None or not user_name:
+            return
+        user_key = self.session_store.key_for(user_name)
+        stored = self.session_store.get(user_key)
+        if stored and stored['last_agent']:
+            session.agent_name = stored['last_agent']
+        self.session_store.save(user_key, user_name, session.agent_name)
+
+    def query_database(self, topic):
+        return self.topic_cache.get(topic)
+
+    def search_database(self, text):
+        """Return the best ranked (BM25) details for a free-form question.
+
+        Rows matching every word are tried before rows matching any word,
+        and a hit scoring below MIN_SEARCH_SCORE counts as no answer.
+        """
+        if not self.has_search_index:
+            return None
+        # One-word questions give the same query twice
+        for query in dict.fromkeys(search_query(text, operator) for operator in ("AND", "OR")):
+            if not query:
+                return None
+            # Topic matches weigh more than matches in the details text
+            try:
+                result = self.db.reader().execute(
+                    "SELECT details, -bm25(info_fts, 10.0, 1.0) AS score FROM info_fts "
+                    "WHERE info_fts MATCH ? ORDER BY score DESC LIMIT 1", (query,)).fetchone()
+            except sqlite3.DatabaseError:
+                # A missing or out-of-date index must not break the reply; later stages still answer
+                return None
+            if result and result[1] >= MIN_SEARCH_SCORE:
+                return result[0]
+        return None
+
+    def sentiment_stats(self):
+        """Report how often sentiment was needed and how well the cache did."""
+        cache = self.polarity.cache_info()
+        with self.stats_lock:
+            messages, sentiment_needed = self.messages_answered, self.sentiment_needed
+        return {
+            "messages": messages,
+            "sentiment_needed": sentiment_needed,
+            "cache_hits": cache.hits,
+            "cache_misses": cache.misses,
+            "cache_size": cache.currsize,
+        }
+
+    def get_response(self, user_input, user_name=''):
+        """Match a message against the database and response tables."""
+        with self.stats_lock:
+            self.messages_answered += 1
+        message = Message(user_input, user_name, self.response_set)
+        if self.metrics is not None:
+            return self._timed_response(message)
+        for _, stage in self.stages:
+            reply = stage(message)
+            if reply:
+                return reply
+
+    def _timed_response(self, message):
+        metrics = self.metrics
+        metrics.count("messages")
+        for name, stage in self.stages:
+            start = time.perf_counter()
+            reply = stage(message)
+            metrics.observe_stage(name, time.perf_counter() - start, bool(reply))
+            if reply:
+                return reply
+
+    # Check for database topics
+    def database_stage(self, message):
+        return self.query_database(message.lower)
+
+    # Check for humor or small talk keywords
+    def keyword_stage(self, message):
+        if "joke" in message.lower:
+            return random.choice(message.response_set.jokes)
+        elif "hello" in message.lower or "hi" in message.lower:
+            return f"Hello, {message.user_name}! How can I brighten your day?"
+
+    # Check for exact matches
+    def exact_stage(self, message):
+        responses = message.response_set.responses
+        if message.lower in responses:
+            return responses[message.lower].format(name=message.user_name)
+
+    # Check for close matches using the trigram index and difflib
+    def close_match_stage(self, message):
+        closest_match = message.response_set.intent_index.closest(message.lower, cutoff=0.8)
+        if closest_match:
+            response = message.response_set.responses[closest_match].format(name=message.user_name)
+            return f"Did you mean '{closest_match}'? {response}"
+
+    # Match paraphrases against responses and topics with TF-IDF cosine similarity
+    def semantic_stage(self, message):
+        match = message.response_set.semantic_index.best(message.lower, self.semantic_threshold)
+        if match is None:
+            return None
+        (kind, key), _ = match
+        if kind == "info":
+            return message.response_set.info_details[key]
+        return message.response_set.responses[key].format(name=message.user_name)
+
+    # Search the database for free-form questions
+    def search_stage(self, message):
+        return self.search_database(message.lower)
+
+    # Sentiment-based fallback, only computed when nothing else matched
+    def sentiment_stage(self, message):
+        with self.stats_lock:
+            self.sentiment_needed += 1
+        sentiment = self.polarity(normalize_text(message.text))
+        if sentiment > 0.5:
+            return f"You seem really happy, {message.user_name}! Keep up the good vibes!"
+        elif sentiment < -0.5:
+            return f"I'm sorry to hear that, {message.user_name}. Maybe a campus counselor could help?"
+
+    # General fallback response
+    def fallback_stage(self, message):
+        fallback_responses = message.response_set.fallback_responses
+        if fallback_responses:
+            return random.choice(fallback_responses).format(name=message.user_name)
+        else:
+            return "I'm not sure how to respond to that, but I'll try to improve!"
+
+    def respond(self, session, text):
+        """Handle one message from a session and return the agent's replies.
+
+        Sets session.closed once the conversation is over.
+        """
+        if not text.strip() or session.closed:
+            return []
+
+        # Check for feedback if session is ending
+        if session.awaiting_feedback:
+            return [self.process_feedback(session, text)]
+
+        # Check for exit condition
+        if text.lower() in EXIT_WORDS:
+            session.awaiting_feedback = True
+            return [
+                f"Thank you for chatting, {session.user_name}! Have a great day!",
+                f"Was my assistance helpful today, {session.user_name}? Reply with Yes or No."
+            ]
+
+        # Simulate random disconnection
+        if random.random() < self.disconnect_rate:
+            session.closed = True
+            if self.metrics is not None:
+                self.metrics.count("disconnects")
+            return ["Oops! It seems we've been disconnected. Please try again later."]
+
+        return [self.get_response(text, session.user_name)]
+
+    def process_feedback(self, session, user_response):
+        user_response_lower = user_response.strip().lower()
+        if user_response_lower in ["yes", "y"]:
+            reply = f"Thank you for your feedback, {session.user_name}! Have a wonderful day!"
+        elif user_response_lower in ["no", "n"]:
+            reply = f"I'm sorry I couldn't be more helpful, {session.user_name}. I'll strive to do better next time."
+        else:
+            return f"I didn't quite catch that, {session.user_name}. Please reply with Yes or No."
+        session.awaiting_feedback = False
+        session.closed = True
+        return reply
@@ -0,0 +1,51 @@
+from collections import defaultdict
+from difflib import get_close_matches
+
+
+# Split text into padded character trigrams
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class IntentIndex:
+    """Trigram inverted index over the response keys.
+
+    get_close_matches compares the message against every key. The index
+    shortlists the keys that share trigrams with the message and whose
+    length can still reach the cutoff, and only runs difflib on those.
+    """
+
+    def __init__(self, keys, shortlist_size=50):
+        self.shortlist_size = shortlist_size
+        self.keys = list(keys)
+        self.postings = defaultdict(list)
+        for key_id, key in enumerate(self.keys):
+            for gram in trigrams(key):
+                self.postings[gram].append(key_id)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def shortlist(self, text, cutoff=0.8):
+        """Return the keys most likely to pass the difflib cutoff."""
+        size = len(text)
+        # ratio = 2 * matches / (len(a) + len(b)) can only reach the cutoff
+        # when the two lengths are close enough
+        min_len = size * cutoff / (2 - cutoff)
+        max_len = size * (2 - cutoff) / cutoff
+        shared = defaultdict(int)
+        for gram in trigrams(text):
+            for key_id in self.postings.get(gram, ()):
+                shared[key_id] += 1
+        candidates = [
+            key_id for key_id in shared
+            if min_len <= len(self.keys[key_id]) <= max_len
+        ]
+        candidates.sort(key=lambda key_id: shared[key_id], reverse=True)
+        return [self.keys[key_id] for key_id in candidates[:self.shortlist_size]]
+
+    def closest(self, text, cutoff=0.8):
+        """Return the closest key above the cutoff, or None."""
+        matches = get_close_matches(text, self.shortlist(text, cutoff), n=1, cutoff=cutoff)
+        return matches[0] if matches else None
@@ -0,0 +1,74 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+# Questions sent by the simulated students
+SAMPLE_MESSAGES = [
+    "library", "admissions", "coffee", "what about parking?", "tell me a joke",
+    "hello", "scholarship", "What are the library hours?", "transport", "fees",
+    "What is the capital of France?", "I am feeling great today!", "sports", "evnts",
+]
+
+
+# Return the value at the given percentile of a sorted list
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+async def open_connection(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.port)
+
+
+# Simulate one student sending messages, reconnecting after a disconnect
+async def run_client(client_id, args, latencies):
+    rng = random.Random(client_id)
+    reader = writer = None
+    for _ in range(args.messages):
+        if writer is None:
+            reader, writer = await open_connection(args)
+            writer.write(json.dumps({"name": f"student{client_id}"}).encode() + b"\n")
+            await writer.drain()
+            await reader.readline()
+        start = time.perf_counter()
+        writer.write(json.dumps({"text": rng.choice(SAMPLE_MESSAGES)}).encode() + b"\n")
+        await writer.drain()
+        line = await reader.readline()
+        latencies.append(time.perf_counter() - start)
+        if not line or json.loads(line).get("closed"):
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(args):
+    latencies = []
+    start = time.perf_counter()
+    await asyncio.gather(*(run_client(i, args, latencies) for i in range(args.clients)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    print(f"Clients: {args.clients}, messages: {len(latencies)}, elapsed: {elapsed:.2f}s")
+    print(f"Throughput: {len(latencies) / elapsed:.1f} messages/sec")
+    print(f"Latency p50: {percentile(latencies, 50) * 1000:.2f} ms, "
+          f"p99: {percentile(latencies, 99) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="connect to a Unix socket instead of TCP")
+    parser.add_argument("--clients", type=int, default=100, help="concurrent sessions")
+    parser.add_argument("--messages", type=int, default=50, help="messages per session")
+    asyncio.run(run_load(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+import argparse
+import gzip
+import json
+import re
+import sqlite3
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+from db import resolve_path
+from response_set import DEFAULT_JOKES, load_responses
+
+# A chat log line: "[2025-01-15 12:43:59] Speaker: text"
+LINE_PATTERN = re.compile(r"^\[(\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\] ([^:]+): (.*)$")
+
+# Fixed agent replies and the label they are reported under
+FIXED_REPLIES = [
+    ("goodbye", "Thank you for chatting, {name}! Have a great day!"),
+    ("feedback", "Was my assistance helpful today, {name}? Reply with Yes or No."),
+    ("feedback", "Thank you for your feedback, {name}! Have a wonderful day!"),
+    ("feedback", "I'm sorry I couldn't be more helpful, {name}. I'll strive to do better next time."),
+    ("feedback", "I didn't quite catch that, {name}. Please reply with Yes or No."),
+    ("disconnect", "Oops! It seems we've been disconnected. Please try again later."),
+    ("hello", "Hello, {name}! How can I brighten your day?"),
+    ("sentiment", "You seem really happy, {name}! Keep up the good vibes!"),
+    ("sentiment", "I'm sorry to hear that, {name}. Maybe a campus counselor could help?"),
+    ("fallback", "I'm not sure how to respond to that, but I'll try to improve!"),
+]
+
+# Labels that mean the question was not really answered
+UNANSWERED = {"fallback", "sentiment", "unknown"}
+
+
+# Stream (timestamp, speaker, text) tuples from a plain or gzipped log
+def read_log(path):
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", errors="replace") as log_file:
+        for line in log_file:
+            match = LINE_PATTERN.match(line.rstrip("\n"))
+            if match:
+                yield match.groups()
+
+
+# Replace curly quotes so older log lines match the current templates
+def normalize_quotes(text):
+    return text.replace("\u2019", "'").replace("\u2018", "'")
+
+
+class ReplyClassifier:
+    """Work out which stage of the bot produced an agent reply."""
+
+    def __init__(self, responses_file="responses.json", db_path="university_info.db"):
+        data = load_responses(resolve_path(responses_file))
+        templates = list(FIXED_REPLIES)
+        templates += [(f"response:{key}", text) for key, text in data["responses"].items()]
+        templates += [("fallback", text) for text in data.get("fallback_responses", [])]
+        # Replies without a {name} placeholder are matched with one dict lookup
+        self.exact = {joke: "joke" for joke in data.get("jokes", DEFAULT_JOKES)}
+        conn = sqlite3.connect(resolve_path(db_path))
+        try:
+            for topic, details in conn.execute("SELECT topic, details FROM info"):
+                self.exact[details] = f"db:{topic}"
+        finally:
+            conn.close()
+        self.labels = []
+        patterns = []
+        for label, text in templates:
+            if "{name}" not in text:
+                self.exact.setdefault(text, label)
+                continue
+            parts = [re.escape(part) for part in text.split("{name}")]
+            patterns.append(f"(?P<t{len(self.labels)}>{'.*?'.join(parts)})")
+            self.labels.append(label)
+        self.pattern = re.compile("|".join(patterns)) if patterns else None
+        self.did_you_mean = re.compile(r"^Did you mean '([^']*)'\?")
+
+    def classify(self, reply):
+        reply = normalize_quotes(reply)
+        label = self.exact.get(reply)
+        if label:
+            return label
+        match = self.did_you_mean.match(reply)
+        if match:
+            return f"fuzzy:{match.group(1)}"
+        match = self.pattern.fullmatch(reply) if self.pattern else None
+        if match:
+            return self.labels[int(match.lastgroup[1:])]
+        return "unknown"
+
+
+class LogStats:
+    """Mergeable counters for one or more chat log segments.
+
+    Unmatched questions are kept in a counter that is pruned back to the
+    most frequent entries whenever it grows past max_unmatched, so memory
+    stays bounded however large the log is.
+    """
+
+    def __init__(self, max_unmatched=10000):
+        self.max_unmatched = max_unmatched
+        self.lines = 0
+        self.questions = 0
+        self.unanswered = 0
+        self.intents = Counter()
+        self.agents = Counter()
+        self.unmatched = Counter()
+
+    def add_unmatched(self, question, count=1):
+        self.unmatched[question] += count
+        if len(self.unmatched) > self.max_unmatched:
+            self.unmatched = Counter(dict(self.unmatched.most_common(self.max_unmatched // 2)))
+
+    def merge(self, other):
+        self.lines += other.lines
+        self.questions += other.questions
+        self.unanswered += other.unanswered
+        self.intents.update(other.intents)
+        self.agents.update(other.agents)
+        for question, count in other.unmatched.items():
+            self.add_unmatched(question, count)
+        return self
+
+    def report(self, top=10):
+        return {
+            "lines": self.lines,
+            "questions": self.questions,
+            "unanswered": self.unanswered,
+            "unanswered_rate": self.unanswered / self.questions if self.questions else 0.0,
+            "top_unmatched_questions": self.unmatched.most_common(top),
+            "intent_hits": dict(self.intents.most_common()),
+            "agent_messages": dict(self.agents.most_common()),
+        }
+
+
+def analyze_log(path, classifier, max_unmatched=10000):
+    """Pair each "You:" line with the agent reply that follows it."""
+    stats = LogStats(max_unmatched)
+    pending_question = None
+    for _, speaker, text in read_log(path):
+        stats.lines += 1
+        if speaker == "You":
+            pending_question = text
+            continue
+        stats.agents[speaker] += 1
+        if pending_question is None:
+            continue
+        label = classifier.classify(text)
+        stats.questions += 1
+        stats.intents[label] += 1
+        if label in UNANSWERED:
+            stats.unanswered += 1
+            stats.add_unmatched(" ".join(pending_question.lower().split()))
+        pending_question = None
+    return stats
+
+
+# One classifier per worker process
+_worker_classifier = None
+
+
+def _init_worker(responses_file, db_path):
+    global _worker_classifier
+    _worker_classifier = ReplyClassifier(responses_file, db_path)
+
+
+def _analyze_in_worker(path, max_unmatched):
+    return analyze_log(path, _worker_classifier, max_unmatched)
+
+
+def analyze_logs(paths, responses_file="responses.json", db_path="university_info.db",
+                 workers=None, max_unmatched=10000):
+    """Analyze log segments, in parallel when there is more than one."""
+    total = LogStats(max_unmatched)
+    if len(paths) == 1 or workers == 1:
+        classifier = ReplyClassifier(responses_file, db_path)
+        for path in paths:
+            total.merge(analyze_log(path, classifier, max_unmatched))
+        return total
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(responses_file, db_path)) as pool:
+        for stats in pool.map(_analyze_in_worker, paths, [max_unmatched] * len(paths)):
+            total.merge(stats)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize chat logs")
+    parser.add_argument("logs", nargs="*", help="log segments, plain or .gz (default: chat_log.txt)")
+    parser.add_argument("--workers", type=int, help="processes for multiple segments")
+    parser.add_argument("--top", type=int, default=10, help="unmatched questions to list")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    paths = args.logs or [resolve_path("chat_log.txt")]
+    report = analyze_logs(paths, workers=args.workers).report(args.top)
+    if args.json:
+        print(json.dumps(report, indent=4))
+        return
+
+    print(f"Questions: {report['questions']} ({report['lines']} log lines)")
+    print(f"Unanswered or fallback: {report['unanswered']} ({report['unanswered_rate']:.1%})")
+    print("\nTop unmatched questions:")
+    for question, count in report["top_unmatched_questions"]:
+        print(f"  {count:>6}  {question}")
+    print("\nIntent hits:")
+    for label, count in report["intent_hits"].items():
+        print(f"  {count:>6}  {label}")
+    print("\nMessages per agent:")
+    for agent, count in report["agent_messages"].items():
+        print(f"  {count:>6}  {agent}")
+
+
+if __name__ == "__main__":
+    main()
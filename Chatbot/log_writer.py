@@ -0,0 +1,87 @@
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from db import resolve_path
+
+# Marks the end of the queue when the writer is closed
+_STOP = object()
+
+
+class ChatLogWriter:
+    """Append chat log lines from a background thread.
+
+    Lines are timestamped when they are written, queued, and flushed to
+    disk in batches once batch_size lines are waiting or flush_interval
+    seconds have passed. When max_bytes is set the log is rotated to
+    chat_log.txt.1, chat_log.txt.2, ... keeping backup_count old files.
+    Relative paths are taken from the chatbot directory, like the database.
+    """
+
+    def __init__(self, path="chat_log.txt", batch_size=100, flush_interval=1.0,
+                 max_bytes=None, backup_count=5):
+        self.path = resolve_path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.queue = queue.Queue()
+        self.thread = threading.Thread(target=self._run, name="chat-log-writer", daemon=True)
+        self.thread.start()
+
+    def write(self, log_text):
+        """Queue one line in the usual [%Y-%m-%d %H:%M:%S] format."""
+        timestamp = datetime.now().strftime("[%Y-%m-%d %H:%M:%S]")
+        self.queue.put(f"{timestamp} {log_text}\n")
+
+    def close(self):
+        """Flush everything still queued and stop the writer thread."""
+        if self.thread.is_alive():
+            self.queue.put(_STOP)
+            self.thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run(self):
+        log_file = open(self.path, "a", encoding="utf-8")
+        try:
+            stopping = False
+            while not stopping:
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    try:
+                        item = self.queue.get(timeout=max(0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                if not batch:
+                    continue
+                data = "".join(batch)
+                if self.max_bytes and log_file.tell() > 0 and log_file.tell() + len(data) > self.max_bytes:
+                    log_file.close()
+                    self._rotate()
+                    log_file = open(self.path, "a", encoding="utf-8")
+                log_file.write(data)
+                log_file.flush()
+        finally:
+            log_file.close()
+
+    def _rotate(self):
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
@@ -0,0 +1,88 @@
+import threading
+from bisect import bisect_left
+
+# Upper bounds of the latency buckets, in seconds
+DEFAULT_BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0)
+
+
+class Histogram:
+    """Latency histogram with fixed bucket bounds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        # One extra slot for observations above the last bound (+Inf)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.total,
+            "buckets": dict(zip([str(bound) for bound in self.buckets] + ["+Inf"], self.counts)),
+        }
+
+
+class Metrics:
+    """Per-stage timings, stage hits and event counters for the response engine.
+
+    The engine only records into this when one is attached, so running
+    without metrics costs a single attribute check per message.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.lock = threading.Lock()
+        self.stage_latency = {}
+        self.stage_hits = {}
+        self.counters = {}
+
+    def observe_stage(self, stage, seconds, hit):
+        with self.lock:
+            histogram = self.stage_latency.get(stage)
+            if histogram is None:
+                histogram = self.stage_latency[stage] = Histogram(self.buckets)
+                self.stage_hits[stage] = 0
+            histogram.observe(seconds)
+            if hit:
+                self.stage_hits[stage] += 1
+
+    def count(self, name, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        """Return all metrics as a JSON-serialisable dict."""
+        with self.lock:
+            return {
+                "counters": dict(self.counters),
+                "stages": {
+                    stage: {"hits": self.stage_hits[stage], **histogram.snapshot()}
+                    for stage, histogram in self.stage_latency.items()
+                },
+            }
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot["counters"].items()):
+            lines.append(f"# TYPE chatbot_{name}_total counter")
+            lines.append(f"chatbot_{name}_total {value}")
+        lines.append("# TYPE chatbot_stage_hits_total counter")
+        for stage, data in snapshot["stages"].items():
+            lines.append(f'chatbot_stage_hits_total{{stage="{stage}"}} {data["hits"]}')
+        lines.append("# TYPE chatbot_stage_seconds histogram")
+        for stage, data in snapshot["stages"].items():
+            cumulative = 0
+            for bound, count in data["buckets"].items():
+                cumulative += count
+                lines.append(f'chatbot_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {cumulative}')
+            lines.append(f'chatbot_stage_seconds_sum{{stage="{stage}"}} {data["sum"]}')
+            lines.append(f'chatbot_stage_seconds_count{{stage="{stage}"}} {data["count"]}')
+        return "\n".join(lines) + "\n"
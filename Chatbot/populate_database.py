@@ -1,19 +1,14 @@
+import argparse
+import csv
+import json
 import sqlite3
+import time
+from itertools import islice
 
-# Connect to the database
-conn = sqlite3.connect('university_info.db')
-cursor = conn.cursor()
-
-# Create the table if it doesn't exist
-cursor.execute('''
-CREATE TABLE IF NOT EXISTS info (
-    topic TEXT PRIMARY KEY,
-    details TEXT
-)
-''')
+from db import resolve_path
 
 # Sample data to insert
-sample_data = [
+SAMPLE_DATA = [
     ("admissions", "Admissions are open from January 10 to March 31. Apply online."),
     ("library", "The library is open 24/7 for students. Remember to bring your ID."),
     ("sports", "Our sports center offers yoga, swimming, and gym facilities. It's open from 6 AM to 10 PM."),
@@ -24,12 +19,172 @@ sample_data = [
     ("hostels", "Campus hostels provide comfortable accommodation. Contact the hostel office for booking.")
 ]
 
-# Insert data into the table
-for topic, details in sample_data:
-    cursor.execute('INSERT OR REPLACE INTO info (topic, details) VALUES (?, ?)', (topic, details))
 
-# Commit and close the connection
-conn.commit()
-conn.close()
+# Create the table if it doesn't exist
+def create_tables(conn):
+    conn.execute('''
+    CREATE TABLE IF NOT EXISTS info (
+        topic TEXT PRIMARY KEY,
+        details TEXT
+    )
+    ''')
+
+
+# Drop the search index and the triggers that keep it in step with info
+def drop_search_index(conn):
+    for trigger in ("info_fts_insert", "info_fts_delete", "info_fts_update"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+    conn.execute("DROP TABLE IF EXISTS info_fts")
+
+
+# Build the FTS5 index used to answer free-form questions
+def build_search_index(conn):
+    drop_search_index(conn)
+    conn.execute('''
+    CREATE VIRTUAL TABLE info_fts USING fts5(
+        topic, details, content='info', content_rowid='rowid'
+    )
+    ''')
+    conn.execute("INSERT INTO info_fts(info_fts) VALUES ('rebuild')")
+    # info_fts only stores the index, so every change to info must be mirrored
+    conn.execute('''
+    CREATE TRIGGER info_fts_insert AFTER INSERT ON info BEGIN
+        INSERT INTO info_fts(rowid, topic, details) VALUES (new.rowid, new.topic, new.details);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER info_fts_delete AFTER DELETE ON info BEGIN
+        INSERT INTO info_fts(info_fts, rowid, topic, details) VALUES ('delete', old.rowid, old.topic, old.details);
+    END
+    ''')
+    conn.execute('''
+    CREATE TRIGGER info_fts_update AFTER UPDATE ON info BEGIN
+        INSERT INTO info_fts(info_fts, rowid, topic, details) VALUES ('delete', old.rowid, old.topic, old.details);
+        INSERT INTO info_fts(rowid, topic, details) VALUES (new.rowid, new.topic, new.details);
+    END
+    ''')
+
+
+# Stream (topic, details) rows from a CSV file with topic and details columns
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as file:
+        for row in csv.DictReader(file):
+            yield row['topic'].strip().lower(), row['details']
+
+
+# Stream (topic, details) rows from a JSON Lines file
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                entry = json.loads(line)
+                yield entry['topic'].strip().lower(), entry['details']
+
+
+# Pick a reader from the file extension
+def read_source(path):
+    if path.endswith('.csv'):
+        return read_csv(path)
+    if path.endswith(('.jsonl', '.ndjson')):
+        return read_jsonl(path)
+    raise ValueError(f"Unsupported source file: {path} (expected .csv or .jsonl)")
+
+
+# Set up a connection for bulk loading
+def open_for_bulk_load(path):
+    # Transactions are managed explicitly below
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA journal_mode = WAL")
+    # Safe with WAL: only the last transactions can be lost on power failure
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")
+    return conn
+
+
+def bulk_load(conn, rows, mode='upsert', batch_size=10000, transaction_size=200000):
+    """Load (topic, details) rows in large transactions.
+
+    In 'upsert' mode existing topics are updated and new ones added.
+    In 'sync' mode topics missing from the input are also deleted.
+    Returns the number of rows read.
+    """
+    create_tables(conn)
+    if mode == 'sync':
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS loaded_topics (topic TEXT PRIMARY KEY)")
+        conn.execute("DELETE FROM loaded_topics")
+
+    rows = iter(rows)
+    loaded = 0
+    uncommitted = 0
+    conn.execute("BEGIN")
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+        conn.executemany(
+            "INSERT INTO info (topic, details) VALUES (?, ?) "
+            "ON CONFLICT(topic) DO UPDATE SET details = excluded.details", batch)
+        if mode == 'sync':
+            conn.executemany("INSERT OR IGNORE INTO loaded_topics (topic) VALUES (?)",
+                             ((topic,) for topic, _ in batch))
+        loaded += len(batch)
+        uncommitted += len(batch)
+        if uncommitted >= transaction_size:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+            uncommitted = 0
+
+    if mode == 'sync':
+        conn.execute("DELETE FROM info WHERE topic NOT IN (SELECT topic FROM loaded_topics)")
+        conn.execute("DROP TABLE loaded_topics")
+    conn.execute("COMMIT")
+    return loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load FAQ entries into university_info.db")
+    parser.add_argument("sources", nargs="*", help="CSV or JSONL files with topic and details; "
+                                                   "the built-in sample data is used when omitted")
+    parser.add_argument("--db", default="university_info.db")
+    parser.add_argument("--mode", choices=["upsert", "sync"], default="upsert",
+                        help="sync also deletes topics that are not in the sources")
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--skip-index", action="store_true",
+                        help="drop the search index instead of rebuilding it after loading")
+    parser.add_argument("--index-only", action="store_true",
+                        help="only rebuild the search index")
+    args = parser.parse_args()
+
+    # Connect to the database
+    conn = open_for_bulk_load(resolve_path(args.db))
+
+    if not args.index_only:
+        # Without the index the load skips the per-row triggers; with --skip-index
+        # the bot answers from exact lookups until --index-only rebuilds it
+        drop_search_index(conn)
+        if args.sources:
+            rows = (row for source in args.sources for row in read_source(source))
+        else:
+            rows = SAMPLE_DATA
+        start = time.perf_counter()
+        loaded = bulk_load(conn, rows, mode=args.mode, batch_size=args.batch_size)
+        elapsed = time.perf_counter() - start
+        print(f"Loaded {loaded} rows in {elapsed:.2f}s ({loaded / max(elapsed, 1e-9):.0f} rows/sec)")
+
+    # Rebuild the search index once all rows are in
+    if not args.skip_index:
+        start = time.perf_counter()
+        conn.execute("BEGIN")
+        build_search_index(conn)
+        conn.execute("COMMIT")
+        print(f"Search index built in {time.perf_counter() - start:.2f}s")
+
+    # Close the connection
+    conn.close()
+
+    print("Database populated successfully.")
+
 
-print("Database populated successfully.")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+import argparse
+import json
+import platform
+import random
+import time
+from datetime import datetime
+
+from db import resolve_path
+from engine import Message, ResponseEngine
+from load_client import percentile
+from log_analytics import read_log
+
+# Free-form questions mixed into synthetic workloads
+SYNTHETIC_QUESTIONS = [
+    "What are the library hours?", "When do admissions close?", "Where can I park my car?",
+    "Is there a gym on campus?", "How do I apply for a scholarship?", "What is the capital of France?",
+    "I am feeling great today!", "I am so sad and tired.", "tell me a joke", "hello there",
+]
+
+
+# Pull the user utterances out of chat logs
+def logged_utterances(paths):
+    return [text for path in paths for _, speaker, text in read_log(path) if speaker == "You"]
+
+
+# Build a workload from response keys, typos of them and free-form questions
+def synthetic_utterances(engine, count, seed=0):
+    rng = random.Random(seed)
+    keys = list(engine.response_set.responses)
+    utterances = []
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.3:
+            utterances.append(rng.choice(keys))
+        elif kind < 0.5:
+            chars = list(rng.choice(keys))
+            chars[rng.randrange(len(chars))] = rng.choice("abcdefghijklmnopqrstuvwxyz")
+            utterances.append("".join(chars))
+        else:
+            utterances.append(rng.choice(SYNTHETIC_QUESTIONS))
+    return utterances
+
+
+def replay(engine, utterances, user_name="benchmark"):
+    """Run every utterance through the engine's stages, timing each stage."""
+    stage_time = {name: 0.0 for name, _ in engine.stages}
+    stage_calls = dict.fromkeys(stage_time, 0)
+    stage_hits = dict.fromkeys(stage_time, 0)
+    latencies = []
+    start = time.perf_counter()
+    for text in utterances:
+        message_start = time.perf_counter()
+        message = Message(text, user_name, engine.response_set)
+        for name, stage in engine.stages:
+            stage_start = time.perf_counter()
+            reply = stage(message)
+            stage_time[name] += time.perf_counter() - stage_start
+            stage_calls[name] += 1
+            if reply:
+                stage_hits[name] += 1
+                break
+        latencies.append(time.perf_counter() - message_start)
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "messages": len(utterances),
+        "elapsed_s": elapsed,
+        "messages_per_s": len(utterances) / elapsed if elapsed else 0.0,
+        "latency_ms": {f"p{pct}": percentile(latencies, pct) * 1000 for pct in (50, 90, 99)},
+        "stages": {
+            name: {
+                "calls": stage_calls[name],
+                "hits": stage_hits[name],
+                "total_ms": stage_time[name] * 1000,
+                "mean_us": stage_time[name] * 1e6 / stage_calls[name] if stage_calls[name] else 0.0,
+            }
+            for name in stage_time
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay chat workloads through the response engine")
+    parser.add_argument("logs", nargs="*", help="chat logs to replay (default: chat_log.txt)")
+    parser.add_argument("--synthetic", type=int, default=0,
+                        help="replay this many generated messages instead of logs")
+    parser.add_argument("--repeat", type=int, default=1, help="replay the workload this many times")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    args = parser.parse_args()
+
+    engine = ResponseEngine(disconnect_rate=0)
+    try:
+        if args.synthetic:
+            workload = f"synthetic:{args.synthetic}"
+            utterances = synthetic_utterances(engine, args.synthetic)
+        else:
+            paths = args.logs or [resolve_path("chat_log.txt")]
+            workload = ",".join(paths)
+            utterances = logged_utterances(paths)
+        # Warm up caches and lazy imports before timing
+        replay(engine, utterances[:50])
+        results = replay(engine, utterances * args.repeat)
+    finally:
+        engine.close()
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "workload": workload,
+        **results,
+    }
+    print(f"Replayed {results['messages']} messages: {results['messages_per_s']:.0f} msg/s, "
+          f"p50 {results['latency_ms']['p50']:.3f} ms, p99 {results['latency_ms']['p99']:.3f} ms")
+    print(f"{'stage':<12} | {'calls':>8} | {'hits':>8} | {'mean us':>9} | {'total ms':>9}")
+    for name, stage in results["stages"].items():
+        print(f"{name:<12} | {stage['calls']:>8} | {stage['hits']:>8} | "
+              f"{stage['mean_us']:>9.1f} | {stage['total_ms']:>9.1f}")
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=4)
+        print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+import json
+import os
+import threading
+from types import MappingProxyType
+
+from intent_index import IntentIndex
+from semantic_index import SemanticIndex
+
+# Jokes used when responses.json does not define any
+DEFAULT_JOKES = [
+    "Why don't skeletons fight each other? They don't have the guts!",
+    "Why did the scarecrow win an award? Because he was outstanding in his field!",
+    "What do you call fake spaghetti? An impasta!"
+]
+
+
+# Load responses from JSON file
+def load_responses(filename):
+    with open(filename, 'r') as file:
+        return json.load(file)
+
+
+# Check that a list from responses.json only holds {name} templates
+def _check_templates(label, texts):
+    for text in texts:
+        if not isinstance(text, str):
+            raise ValueError(f"{label} must be strings, got {text!r}")
+        text.format(name='')
+
+
+class ResponseSet:
+    """Immutable snapshot of responses.json with its prebuilt match indexes.
+
+    The engine swaps whole snapshots, so a message is always answered
+    from one consistent set of tables. info_rows are (topic, details)
+    pairs from the database that the semantic index also classifies into.
+    """
+
+    def __init__(self, responses, fallback_responses=(), jokes=DEFAULT_JOKES,
+                 info_rows=(), stop_words=frozenset()):
+        self.responses = MappingProxyType(dict(responses))
+        self.fallback_responses = tuple(fallback_responses)
+        self.jokes = tuple(jokes)
+        self.info_details = MappingProxyType(dict(info_rows))
+        self.intent_index = IntentIndex(self.responses)
+        intents = [(("response", key), f"{key} {text.replace('{name}', '')}")
+                   for key, text in self.responses.items()]
+        intents += [(("info", topic), f"{topic} {details}") for topic, details in self.info_details.items()]
+        self.semantic_index = SemanticIndex(intents, stop_words)
+
+    @classmethod
+    def from_file(cls, filename, info_rows=(), stop_words=frozenset()):
+        """Parse and validate responses.json; raises ValueError if it is malformed."""
+        data = load_responses(filename)
+        responses = data.get('responses') if isinstance(data, dict) else None
+        if not isinstance(responses, dict):
+            raise ValueError(f"{filename} has no 'responses' object")
+        try:
+            _check_templates("responses", responses.values())
+            _check_templates("fallback_responses", data.get('fallback_responses', []))
+            _check_templates("jokes", data.get('jokes', []))
+        except (KeyError, IndexError) as e:
+            raise ValueError(f"Unknown placeholder {e} in {filename}") from None
+        return cls(responses, data.get('fallback_responses', []), data.get('jokes', DEFAULT_JOKES),
+                   info_rows, stop_words)
+
+
+class ResponseWatcher:
+    """Reload the engine's responses when responses.json changes on disk.
+
+    Polls the file's mtime and size every interval seconds. A changed file
+    is parsed and indexed on the watcher thread, then swapped into the
+    engine in one assignment. A broken file leaves the current snapshot in
+    place and is reported through last_error.
+    """
+
+    def __init__(self, engine, interval=1.0):
+        self.engine = engine
+        self.interval = interval
+        self.last_error = None
+        self.reloads = 0
+        self.stamp = self._stamp()
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="responses-watcher", daemon=True)
+
+    def _stamp(self):
+        try:
+            stat = os.stat(self.engine.responses_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stop_event.set()
+        if self.thread.is_alive():
+            self.thread.join()
+
+    def check(self):
+        """Reload now if the file changed; returns True when a new set was swapped in."""
+        stamp = self._stamp()
+        if stamp is None or stamp == self.stamp:
+            return False
+        self.stamp = stamp
+        try:
+            self.engine.reload_responses()
+        except (OSError, ValueError) as e:
+            self.last_error = e
+            return False
+        self.last_error = None
+        self.reloads += 1
+        return True
+
+    def _run(self):
+        while not self.stop_event.wait(self.interval):
+            self.check()
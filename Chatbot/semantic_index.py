@@ -0,0 +1,145 @@
+import math
+import re
+from collections import Counter, defaultdict
+
+# Words with this suffix are folded onto their stem ("hostels" -> "hostel")
+_PLURAL = re.compile(r"(?<=[a-z]{3})s$")
+
+
+# Import NumPy on first use, keeping it out of the engine's import time
+def load_numpy():
+    try:
+        import numpy
+    except ImportError:  # NumPy is optional; scoring falls back to pure Python
+        return None
+    return numpy
+
+
+# Split text into lowercase word tokens, folding simple plurals
+def tokenize(text, stop_words=frozenset()):
+    words = re.findall(r"[a-z0-9]+", text.lower())
+    return [_PLURAL.sub("", word) for word in words if word not in stop_words]
+
+
+class SemanticIndex:
+    """TF-IDF intent classifier with cosine similarity.
+
+    Each intent is a label plus the text describing it. Intent vectors are
+    L2-normalised and kept as posting lists, one per vocabulary term, so
+    scoring a message only touches the intents that share a word with it.
+    With NumPy the postings are packed into CSR arrays (term offsets,
+    intent ids, weights) and scores are summed with bincount, so memory
+    grows with the number of non-zero weights rather than
+    vocabulary x intents.
+    """
+
+    # Upper bound on the scores buffer (messages x intents) of one best_batch chunk
+    batch_cells = 1 << 20
+
+    def __init__(self, intents, stop_words=frozenset()):
+        self.stop_words = frozenset(stop_words)
+        self.labels = []
+        term_counts = []
+        document_frequency = Counter()
+        for label, text in intents:
+            counts = Counter(tokenize(text, self.stop_words))
+            if not counts:
+                continue
+            self.labels.append(label)
+            term_counts.append(counts)
+            document_frequency.update(counts.keys())
+
+        size = len(self.labels)
+        self.vocabulary = {term: i for i, term in enumerate(document_frequency)}
+        self.idf = [0.0] * len(self.vocabulary)
+        for term, i in self.vocabulary.items():
+            self.idf[i] = math.log((1 + size) / (1 + document_frequency[term])) + 1
+
+        postings = defaultdict(list)
+        for intent_id, counts in enumerate(term_counts):
+            weights = {self.vocabulary[term]: count * self.idf[self.vocabulary[term]]
+                       for term, count in counts.items()}
+            norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+            for term_id, weight in weights.items():
+                postings[term_id].append((intent_id, weight / norm))
+
+        self.np = load_numpy()
+        if self.np is None:
+            self.postings = postings
+            return
+        np = self.np
+        lengths = [len(postings[term_id]) for term_id in range(len(self.vocabulary))]
+        self.offsets = np.zeros(len(lengths) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self.offsets[1:])
+        entries = [entry for term_id in range(len(self.vocabulary)) for entry in postings[term_id]]
+        self.intent_ids = np.fromiter((intent_id for intent_id, _ in entries), dtype=np.int32, count=len(entries))
+        self.weights = np.fromiter((weight for _, weight in entries), dtype=np.float32, count=len(entries))
+
+    def __len__(self):
+        return len(self.labels)
+
+    def _query(self, text):
+        """Return (term ids, normalised weights) for the known words of a message."""
+        counts = Counter(self.vocabulary[term] for term in tokenize(text, self.stop_words)
+                         if term in self.vocabulary)
+        weights = {term_id: count * self.idf[term_id] for term_id, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values()))
+        if not norm:
+            return [], []
+        return list(weights), [weight / norm for weight in weights.values()]
+
+    def _gather(self, term_ids, weights):
+        # Concatenate the postings of the query terms, scaled by the query weights
+        np = self.np
+        starts = self.offsets[term_ids]
+        lengths = self.offsets[np.asarray(term_ids) + 1] - starts
+        positions = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.intent_ids[positions], self.weights[positions] * np.repeat(
+            np.asarray(weights, dtype=np.float32), lengths)
+
+    def best(self, text, threshold=0.4):
+        """Return (label, score) for the closest intent above threshold, or None."""
+        term_ids, weights = self._query(text)
+        if not term_ids:
+            return None
+        if self.np is not None:
+            intent_ids, contributions = self._gather(term_ids, weights)
+            scores = self.np.bincount(intent_ids, weights=contributions, minlength=len(self.labels))
+            best_id = int(scores.argmax())
+            score = float(scores[best_id])
+        else:
+            scores = defaultdict(float)
+            for term_id, weight in zip(term_ids, weights):
+                for intent_id, intent_weight in self.postings[term_id]:
+                    scores[intent_id] += weight * intent_weight
+            best_id, score = max(scores.items(), key=lambda item: item[1])
+        return (self.labels[best_id], score) if score >= threshold else None
+
+    def best_batch(self, texts, threshold=0.4):
+        """Classify many messages, summing all their postings at once (when NumPy is available)."""
+        if self.np is None or not self.labels:
+            return [self.best(text, threshold) for text in texts]
+        np = self.np
+        size = len(self.labels)
+        chunk = max(1, self.batch_cells // size)
+        results = []
+        for first in range(0, len(texts), chunk):
+            rows = texts[first:first + chunk]
+            cells, contributions, matched = [], [], []
+            for row, text in enumerate(rows):
+                term_ids, weights = self._query(text)
+                matched.append(bool(term_ids))
+                if term_ids:
+                    intent_ids, scaled = self._gather(term_ids, weights)
+                    cells.append(intent_ids + row * size)
+                    contributions.append(scaled)
+            scores = np.zeros(len(rows) * size)
+            if cells:
+                scores = np.bincount(np.concatenate(cells), weights=np.concatenate(contributions),
+                                     minlength=len(rows) * size)
+            scores = scores.reshape(len(rows), size)
+            best_ids = scores.argmax(axis=1)
+            best_scores = scores[np.arange(len(rows)), best_ids]
+            results += [(self.labels[best_id], float(score)) if found and score >= threshold else None
+                        for found, best_id, score in zip(matched, best_ids.tolist(), best_scores.tolist())]
+        return results
@@ -0,0 +1,161 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from engine import ResponseEngine
+from log_writer import ChatLogWriter
+from metrics import Metrics
+from response_set import ResponseWatcher
+from session_store import SessionStore
+
+
+class ChatServer:
+    """Serve many chat sessions over line-delimited JSON.
+
+    Every connection is one session. Clients send lines such as
+    {"name": "Sam"} or {"text": "library"} and get back one line per
+    message: {"agent": ..., "replies": [...], "closed": false}.
+    Matching runs in a thread pool so TextBlob and SQLite never block
+    the event loop.
+    """
+
+    def __init__(self, engine, workers=8, chat_log=None):
+        self.engine = engine
+        self.chat_log = chat_log
+        self.executor = ThreadPoolExecutor(max_workers=workers)
+        self.active_sessions = 0
+
+    async def handle_client(self, reader, writer):
+        session = self.engine.new_session()
+        self.active_sessions += 1
+        try:
+            while not session.closed:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than the stream limit (64 KiB); the rest of it cannot be told
+                    # apart from the next message, so the session ends here
+                    session.closed = True
+                    reply = {"error": "message too long", "closed": True}
+                else:
+                    if not line:
+                        break
+                    reply = await self.handle_line(session, line)
+                writer.write(json.dumps(reply).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.active_sessions -= 1
+            writer.close()
+
+    async def handle_line(self, session, line):
+        """Decode one client line and reply to it; an engine error ends the session."""
+        try:
+            message = json.loads(line)
+        except ValueError:
+            return {"error": "invalid JSON"}
+        try:
+            return await self.handle_message(session, message)
+        except Exception as e:
+            session.closed = True
+            print(f"Error handling message: {e!r}")
+            return {"error": "internal error", "closed": True}
+
+    async def handle_message(self, session, message):
+        """Apply one decoded client message to its session and build the reply."""
+        if not isinstance(message, dict):
+            return {"error": "expected a JSON object"}
+        loop = asyncio.get_running_loop()
+        if message.get("name"):
+            await loop.run_in_executor(
+                self.executor, self.engine.identify, session, str(message["name"]).strip())
+        replies = []
+        if message.get("text"):
+            replies = await loop.run_in_executor(
+                self.executor, self.engine.respond, session, str(message["text"]))
+            self.log_exchange(session, str(message["text"]), replies)
+        return {"agent": session.agent_name, "replies": replies, "closed": session.closed}
+
+    def log_exchange(self, session, text, replies):
+        if self.chat_log is None:
+            return
+        self.chat_log.write(f"You: {text}")
+        for reply in replies:
+            self.chat_log.write(f"{session.agent_name}: {reply}")
+
+    async def handle_metrics(self, reader, writer):
+        """Answer GET /metrics (Prometheus text) and GET /metrics.json."""
+        request_line = (await reader.readline()).decode(errors="replace").split()
+        while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+            pass
+        path = request_line[1] if len(request_line) > 1 else "/"
+        metrics = self.engine.metrics
+        if metrics is None or path not in ("/metrics", "/metrics.json"):
+            status, content_type, body = "404 Not Found", "text/plain", "not found\n"
+        elif path == "/metrics.json":
+            status, content_type, body = "200 OK", "application/json", json.dumps(metrics.snapshot())
+        else:
+            status, content_type, body = "200 OK", "text/plain; version=0.0.4", metrics.to_prometheus()
+        payload = body.encode()
+        writer.write(f"HTTP/1.0 {status}\r\nContent-Type: {content_type}\r\n"
+                     f"Content-Length: {len(payload)}\r\n\r\n".encode() + payload)
+        await writer.drain()
+        writer.close()
+
+    async def serve(self, host='127.0.0.1', port=8765, unix_path=None, metrics_port=None):
+        if metrics_port:
+            await asyncio.start_server(self.handle_metrics, host, metrics_port)
+            print(f"Metrics available at http://{host}:{metrics_port}/metrics")
+        if unix_path:
+            server = await asyncio.start_unix_server(self.handle_client, path=unix_path)
+            print(f"Chat server listening on {unix_path}")
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port)
+            print(f"Chat server listening on {host}:{port}")
+        async with server:
+            await server.serve_forever()
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="University of Poppleton chat server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--unix", help="listen on a Unix socket instead of TCP")
+    parser.add_argument("--workers", type=int, default=8, help="threads for blocking work")
+    parser.add_argument("--disconnect-rate", type=float, default=0.05,
+                        help="chance of a simulated disconnect per message")
+    parser.add_argument("--log-file", default="chat_log.txt", help="chat log path, empty to disable")
+    parser.add_argument("--log-max-bytes", type=int, default=0, help="rotate the chat log at this size")
+    parser.add_argument("--no-watch", action="store_true", help="do not reload responses.json when it changes")
+    parser.add_argument("--sessions-db", default="user_preferences.db",
+                        help="remember users' last agent here, empty to disable")
+    parser.add_argument("--metrics-port", type=int, help="serve per-stage metrics over HTTP on this port")
+    args = parser.parse_args()
+
+    metrics = Metrics() if args.metrics_port else None
+    session_store = SessionStore(args.sessions_db) if args.sessions_db else None
+    engine = ResponseEngine('responses.json', 'university_info.db', disconnect_rate=args.disconnect_rate,
+                            metrics=metrics, session_store=session_store)
+    chat_log = ChatLogWriter(args.log_file, max_bytes=args.log_max_bytes) if args.log_file else None
+    server = ChatServer(engine, workers=args.workers, chat_log=chat_log)
+    watcher = None if args.no_watch else ResponseWatcher(engine).start()
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix, args.metrics_port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        server.close()
+        engine.close()
+        if chat_log is not None:
+            chat_log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from db import resolve_path
+
+
+class SessionStore:
+    """Per-user preferences (name and last agent) kept in SQLite.
+
+    Every update is a single-row upsert, so nothing is rewritten when one
+    user changes. Each thread gets its own connection and the database is
+    in WAL mode, so many sessions can save at once. On first use the old
+    single-user user_preferences.json is imported.
+    """
+
+    def __init__(self, path='user_preferences.db', legacy_file='user_preferences.json', timeout=5.0):
+        self.path = resolve_path(path)
+        self.timeout = timeout
+        self.local = threading.local()
+        self.connections = []
+        self.lock = threading.Lock()
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode = WAL")
+        with conn:
+            conn.execute('''CREATE TABLE IF NOT EXISTS preferences (
+                                user_key TEXT PRIMARY KEY,
+                                user_name TEXT,
+                                last_agent TEXT,
+                                updated_at REAL
+                            ) WITHOUT ROWID''')
+        if legacy_file:
+            self._import_legacy(resolve_path(legacy_file))
+
+    def _connection(self):
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.timeout, check_same_thread=False)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            self.local.conn = conn
+            with self.lock:
+                self.connections.append(conn)
+        return conn
+
+    def _import_legacy(self, legacy_file):
+        if not os.path.exists(legacy_file):
+            return
+        conn = self._connection()
+        if conn.execute("SELECT 1 FROM preferences LIMIT 1").fetchone():
+            return
+        with open(legacy_file) as file:
+            data = json.load(file)
+        if data.get('user_name'):
+            self.save(self.key_for(data['user_name']), data['user_name'], data.get('last_agent'))
+
+    @staticmethod
+    def key_for(user_name):
+        """Key users by their name, ignoring case and extra spaces."""
+        return " ".join(user_name.lower().split())
+
+    def get(self, user_key):
+        """Return {'user_name': ..., 'last_agent': ...} for a user, or None."""
+        row = self._connection().execute(
+            "SELECT user_name, last_agent FROM preferences WHERE user_key = ?", (user_key,)).fetchone()
+        return {'user_name': row[0], 'last_agent': row[1]} if row else None
+
+    def save(self, user_key, user_name, last_agent):
+        self.save_many([(user_key, user_name, last_agent)])
+
+    def save_many(self, users):
+        """Upsert (user_key, user_name, last_agent) rows in one transaction."""
+        now = time.time()
+        conn = self._connection()
+        with conn:
+            conn.executemany(
+                "INSERT INTO preferences (user_key, user_name, last_agent, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(user_key) DO UPDATE SET user_name = excluded.user_name, "
+                "last_agent = excluded.last_agent, updated_at = excluded.updated_at",
+                ((user_key, user_name, last_agent, now) for user_key, user_name, last_agent in users))
+
+    def checkpoint(self):
+        """Copy the WAL into the database file and truncate it, e.g. before measuring the file."""
+        self._connection().execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        with self.lock:
+            for conn in self.connections:
+                conn.close()
+            self.connections.clear()
+        self.local = threading.local()
@@ -0,0 +1,89 @@
+import time
+from collections import OrderedDict
+
+
+class TopicCache:
+    """In-memory copy of the info table in front of the database.
+
+    Tables with up to preload_limit rows are loaded whole, so every lookup
+    is a dict hit. Larger tables are cached lazily in an LRU of lru_size
+    topics. The cache is dropped when PRAGMA data_version shows another
+    connection has changed the database, checked at most once every
+    check_interval seconds, or when invalidate() is called.
+    """
+
+    def __init__(self, conn, lock, preload_limit=100000, lru_size=10000, check_interval=1.0):
+        self.conn = conn
+        self.lock = lock
+        self.preload_limit = preload_limit
+        self.lru_size = lru_size
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop cached topics and reload the table if it is small enough."""
+        with self.lock:
+            self.version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+            row_count = self.conn.execute("SELECT COUNT(*) FROM info").fetchone()[0]
+            preloaded = row_count <= self.preload_limit
+            if preloaded:
+                topics = dict(self.conn.execute("SELECT topic, details FROM info"))
+            else:
+                topics = OrderedDict()
+            # Published as one tuple, so get() never pairs the new mode with the old topics
+            self.state = (topics, preloaded)
+        self.last_check = time.monotonic()
+
+    def _check_version(self):
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return
+        self.last_check = now
+        with self.lock:
+            version = self.conn.execute("PRAGMA data_version").fetchone()[0]
+        if version != self.version:
+            self.invalidate()
+
+    def get(self, topic):
+        """Return the details for a topic, or None if it does not exist."""
+        self._check_version()
+        topics, preloaded = self.state
+        if preloaded:
+            # The whole table is in memory, so a topic that is not there is a miss
+            details = topics.get(topic)
+            if details is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return details
+        with self.lock:
+            if topic in topics:
+                self.hits += 1
+                topics.move_to_end(topic)
+                return topics[topic]
+            self.misses += 1
+            result = self.conn.execute("SELECT details FROM info WHERE topic = ?", (topic,)).fetchone()
+            details = result[0] if result else None
+            topics[topic] = details
+            if len(topics) > self.lru_size:
+                topics.popitem(last=False)
+        return details
+
+    @property
+    def topics(self):
+        return self.state[0]
+
+    @property
+    def preloaded(self):
+        return self.state[1]
+
+    def stats(self):
+        topics, preloaded = self.state
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "cached_topics": len(topics),
+            "preloaded": preloaded,
+        }
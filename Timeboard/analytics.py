@@ -0,0 +1,180 @@
+from array import array
+from collections import Counter, namedtuple
+from itertools import accumulate
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; every reduction falls back to pure Python
+    np = None
+
+# Per-group statistics as parallel lists, indexed by driver id (or run)
+GroupStats = namedtuple('GroupStats', ['counts', 'totals', 'fastest', 'slowest', 'means', 'm2'])
+
+
+def _python_stats(groups, pairs_by_pass):
+    # Two passes: count/sum/min/max first, then squared deviations from the exact mean
+    counts = [0] * groups
+    totals = [0.0] * groups
+    fastest = [float('inf')] * groups
+    slowest = [float('-inf')] * groups
+    for group, lap_time in pairs_by_pass():
+        counts[group] += 1
+        totals[group] += lap_time
+        if lap_time < fastest[group]:
+            fastest[group] = lap_time
+        if lap_time > slowest[group]:
+            slowest[group] = lap_time
+    means = [total / count if count else 0.0 for total, count in zip(totals, counts)]
+    m2 = [0.0] * groups
+    for group, lap_time in pairs_by_pass():
+        m2[group] += (lap_time - means[group]) ** 2
+    return GroupStats(counts, totals, fastest, slowest, means, m2)
+
+
+def grouped_stats(driver_ids, lap_times, groups):
+    """Reduce flat driver id and lap time columns to per-driver statistics.
+
+    driver_ids holds values in range(groups) and may be in any order.
+    With NumPy this is a handful of bincount/ufunc.at calls over the
+    whole columns; without it, two plain Python passes.
+    """
+    if np is None:
+        return _python_stats(groups, lambda: zip(driver_ids, lap_times))
+    ids = np.asarray(driver_ids, dtype=np.intp)
+    laps = np.asarray(lap_times, dtype=np.float64)
+    counts = np.bincount(ids, minlength=groups)
+    totals = np.bincount(ids, weights=laps, minlength=groups)
+    means = np.divide(totals, counts, out=np.zeros(groups), where=counts > 0)
+    m2 = np.bincount(ids, weights=(laps - means[ids]) ** 2, minlength=groups)
+    fastest = np.full(groups, np.inf)
+    slowest = np.full(groups, -np.inf)
+    np.minimum.at(fastest, ids, laps)
+    np.maximum.at(slowest, ids, laps)
+    return GroupStats(counts.tolist(), totals.tolist(), fastest.tolist(), slowest.tolist(),
+                      means.tolist(), m2.tolist())
+
+
+def run_stats(lap_times, starts, counts):
+    """Reduce contiguous runs of lap_times (start, count) to per-run statistics.
+
+    This is the layout of a lap store, where every (driver, session) group
+    is one run, so NumPy can use reduceat without sorting. Runs must be
+    non-empty.
+    """
+    if np is None:
+        def pairs():
+            for run, (start, count) in enumerate(zip(starts, counts)):
+                for lap_time in lap_times[start:start + count]:
+                    yield run, lap_time
+        return _python_stats(len(starts), pairs)
+    if not len(starts):
+        return GroupStats([], [], [], [], [], [])
+    laps = np.asarray(lap_times, dtype=np.float64)
+    sizes = np.asarray(counts, dtype=np.intp)
+    starts = np.asarray(starts, dtype=np.intp)
+    offsets = np.cumsum(sizes) - sizes
+    if not np.array_equal(starts, offsets) or offsets[-1] + sizes[-1] != len(laps):
+        # Gather the runs back to back so reduceat sees one run per offset
+        laps = laps[np.repeat(starts - offsets, sizes) + np.arange(sizes.sum())]
+    totals = np.add.reduceat(laps, offsets)
+    means = totals / sizes
+    m2 = np.add.reduceat((laps - np.repeat(means, sizes)) ** 2, offsets)
+    return GroupStats(sizes.tolist(), totals.tolist(), np.minimum.reduceat(laps, offsets).tolist(),
+                      np.maximum.reduceat(laps, offsets).tolist(), means.tolist(), m2.tolist())
+
+
+def split_groups(driver_ids, lap_times, groups):
+    """Return each group's lap times, in their original order, as a list of arrays."""
+    if np is None:
+        split = [array('d') for _ in range(groups)]
+        for group, lap_time in zip(driver_ids, lap_times):
+            split[group].append(lap_time)
+        return split
+    ids = np.asarray(driver_ids, dtype=np.intp)
+    laps = np.asarray(lap_times, dtype=np.float64)[np.argsort(ids, kind='stable')]
+    bounds = np.cumsum(np.bincount(ids, minlength=groups))[:-1]
+    return [array('d', part.tobytes()) for part in np.split(laps, bounds)]
+
+
+def value_counts(lap_times, resolution=None):
+    """Return a Counter of lap time -> number of laps, optionally rounded to resolution seconds."""
+    if np is None:
+        return Counter(lap_times)
+    laps = np.asarray(lap_times, dtype=np.float64)
+    if resolution:
+        laps = np.rint(laps / resolution) * resolution
+    values, counts = np.unique(laps, return_counts=True)
+    return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+
+def ranking(fastest):
+    """Return group indexes ordered by fastest lap, keeping the original order on ties."""
+    if np is None:
+        return sorted(range(len(fastest)), key=fastest.__getitem__)
+    return np.argsort(np.asarray(fastest, dtype=np.float64), kind='stable').tolist()
+
+
+# A run of consecutive laps between pit/outlier laps, lap numbers are 1-based
+Stint = namedtuple('Stint', ['start_lap', 'end_lap', 'laps', 'average_lap'])
+
+
+def best_window_average(lap_times, window):
+    """Return (average, first lap number) of the fastest run of window consecutive laps.
+
+    A running sum slides over the laps once, so this is O(n) for any
+    window. Returns None when there are fewer than window laps.
+    """
+    if window < 1 or len(lap_times) < window:
+        return None
+    total = sum(lap_times[:window])
+    best_total, best_start = total, 0
+    for start in range(1, len(lap_times) - window + 1):
+        total += lap_times[start + window - 1] - lap_times[start - 1]
+        if total < best_total:
+            best_total, best_start = total, start
+    return best_total / window, best_start + 1
+
+
+def detect_stints(lap_times, outlier_ratio=1.07):
+    """Split laps into stints at pit/outlier laps.
+
+    A lap slower than outlier_ratio times the driver's fastest lap (the
+    107% rule by default) is treated as an in/out or incident lap and ends
+    the current stint. One pass, O(n).
+    """
+    if not len(lap_times):
+        return []
+    limit = min(lap_times) * outlier_ratio
+    stints = []
+    start = None
+    total = 0.0
+    for lap_number, lap_time in enumerate(lap_times, start=1):
+        if lap_time > limit:
+            if start is not None:
+                stints.append(Stint(start, lap_number - 1, lap_number - start, total / (lap_number - start)))
+                start = None
+            continue
+        if start is None:
+            start, total = lap_number, 0.0
+        total += lap_time
+    if start is not None:
+        count = len(lap_times) - start + 1
+        stints.append(Stint(start, len(lap_times), count, total / count))
+    return stints
+
+
+def gaps_to_leader(laps_by_driver):
+    """Return {driver: array of the gap to the leader after each lap} from each driver's laps.
+
+    The leader after lap k is whoever has the lowest cumulative time over
+    their first k laps. Two passes over every lap, O(total laps).
+    """
+    cumulative = {code: list(accumulate(lap_times)) for code, lap_times in laps_by_driver.items()}
+    leader = []
+    for times in cumulative.values():
+        for lap, time in enumerate(times[:len(leader)]):
+            if time < leader[lap]:
+                leader[lap] = time
+        leader.extend(times[len(leader):])
+    return {code: array('d', [time - best for time, best in zip(times, leader)])
+            for code, times in cumulative.items()}
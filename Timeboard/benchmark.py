@@ -0,0 +1,262 @@
+import argparse
+import contextlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from array import array
+
+import analytics
+import timing
+from lap_store import LapStore
+from timing import Driver, TimingBoard
+from quantiles import LapDistribution
+from season import Season
+
+# Driver codes used in synthetic timing files
+CODES = ["VER", "HAM", "RUS", "PER", "LEC", "SAI", "NOR", "PIA", "ALO", "STR",
+         "GAS", "OCO", "ALB", "SAR", "TSU", "RIC", "BOT", "ZHO", "MAG", "HUL"]
+
+
+def write_timing_file(path, rows, seed=0):
+    """Write a synthetic timing file with the given number of laps."""
+    rng = random.Random(seed)
+    with open(path, 'w') as file:
+        for start in range(0, rows, 100000):
+            count = min(100000, rows - start)
+            file.write("".join(f"{rng.choice(CODES)},{rng.uniform(70, 95):.3f}\n" for _ in range(count)))
+
+
+class ListDriver(Driver):
+    """Driver storing laps in a plain list, as before the array change."""
+
+    def __init__(self, code):
+        super().__init__(code)
+        self.lap_times = []
+
+
+def baseline_ingest(timing_file):
+    """The original line-by-line parser, kept for comparison."""
+    drivers = {}
+    with open(timing_file, 'r') as file:
+        for line in file:
+            if ',' not in line:
+                continue
+            driver_code, lap_time = line.strip().split(',')
+            lap_time = float(lap_time)
+            if driver_code not in drivers:
+                drivers[driver_code] = ListDriver(driver_code)
+            drivers[driver_code].add_lap(lap_time)
+    return drivers
+
+
+def bench_ingest(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "laps.txt")
+        start = time.perf_counter()
+        write_timing_file(path, args.rows)
+        print(f"Wrote {args.rows} laps ({os.path.getsize(path) / 1e6:.0f} MB) "
+              f"in {time.perf_counter() - start:.1f}s")
+
+        start = time.perf_counter()
+        lists = baseline_ingest(path)
+        baseline_s = time.perf_counter() - start
+        list_bytes = sum(sys.getsizeof(driver.lap_times) + len(driver.lap_times) * sys.getsizeof(1.0)
+                         for driver in lists.values())
+        del lists
+
+        backends = [("NumPy", timing.np)] if timing.np is not None else []
+        backends.append(("pure Python", None))
+        chunked = []
+        for label, module in backends:
+            saved, timing.np = timing.np, module
+            try:
+                board = TimingBoard(location="Benchmark")
+                start = time.perf_counter()
+                board.process_timing_file(path)
+                seconds = time.perf_counter() - start
+            finally:
+                timing.np = saved
+            array_bytes = sum(sys.getsizeof(driver.lap_times) for driver in board.drivers.values())
+            chunked.append((label, seconds, array_bytes))
+            del board
+
+    print(f"Line by line into lists:  {baseline_s:.2f}s ({args.rows / baseline_s:,.0f} laps/s), "
+          f"{list_bytes / 1e6:.0f} MB of laps")
+    for label, seconds, array_bytes in chunked:
+        print(f"{'Chunked, ' + label + ':':<25} {seconds:.2f}s ({args.rows / seconds:,.0f} laps/s), "
+              f"{array_bytes / 1e6:.0f} MB of laps")
+
+
+def bench_season(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = [os.path.join(tmp, f"race{i}.txt") for i in range(args.races)]
+        for seed, path in enumerate(paths):
+            write_timing_file(path, args.rows, seed)
+
+        timings = {}
+        for label, workers in (("Serial", 1), ("Process pool", args.workers)):
+            board = TimingBoard(location="Benchmark", keep_laps=False)
+            start = time.perf_counter()
+            Season(board, workers=workers).load(paths)
+            timings[label] = time.perf_counter() - start
+
+    laps = args.races * args.rows
+    for label, seconds in timings.items():
+        print(f"{label:<13} {seconds:.2f}s ({laps / seconds:,.0f} laps/s)")
+
+
+def bench_median(args):
+    rng = random.Random(0)
+    drivers = {code: array('d', (round(rng.uniform(70, 95), 3) for _ in range(args.rows // len(CODES))))
+               for code in CODES}
+    laps = sum(len(lap_times) for lap_times in drivers.values())
+
+    start = time.perf_counter()
+    all_lap_times = [lap_time for lap_times in drivers.values() for lap_time in lap_times]
+    baseline = sorted(all_lap_times)[len(all_lap_times) // 2]
+    baseline_s = time.perf_counter() - start
+    baseline_bytes = sys.getsizeof(all_lap_times) * 2 + len(all_lap_times) * sys.getsizeof(1.0)
+    del all_lap_times
+
+    distribution = LapDistribution()
+    start = time.perf_counter()
+    for lap_times in drivers.values():
+        distribution.update(lap_times)
+    update_s = time.perf_counter() - start
+    start = time.perf_counter()
+    median = distribution.median()
+    query_s = time.perf_counter() - start
+    distribution_bytes = sys.getsizeof(distribution.counts) + len(distribution.counts) * 2 * sys.getsizeof(1.0)
+
+    print(f"Flatten and sort: {baseline_s:.2f}s, ~{baseline_bytes / 1e6:.0f} MB, median {baseline:.3f}")
+    print(f"LapDistribution:  {update_s:.2f}s to add {laps} laps (during ingest), {query_s * 1000:.1f}ms "
+          f"per query, ~{distribution_bytes / 1e6:.1f} MB for {len(distribution.counts)} values, "
+          f"median {median:.3f}")
+
+
+def bench_store(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        text_path = os.path.join(tmp, "race.txt")
+        store_path = os.path.join(tmp, "race.laps")
+        write_timing_file(text_path, args.rows)
+
+        season = Season(TimingBoard(location="Benchmark"), workers=1)
+        start = time.perf_counter()
+        season.load([text_path])
+        text_s = time.perf_counter() - start
+        season.save_laps(store_path)
+
+        start = time.perf_counter()
+        store = LapStore(store_path)
+        open_s = time.perf_counter() - start
+        board = TimingBoard(location="Benchmark", keep_laps=False)
+        start = time.perf_counter()
+        Season(board).load([store_path])
+        board.compute_results()
+        report_s = time.perf_counter() - start
+        sizes = os.path.getsize(text_path), os.path.getsize(store_path)
+        del store, board
+
+    print(f"Text file:  {sizes[0] / 1e6:.0f} MB, parsed in {text_s:.2f}s")
+    print(f"Lap store:  {sizes[1] / 1e6:.0f} MB, opened in {open_s * 1000:.1f}ms, "
+          f"results computed from the mapped laps in {report_s:.2f}s")
+
+
+def bench_export(args):
+    board = TimingBoard(location="Benchmark")
+    rng = random.Random(0)
+    for code in CODES:
+        board._add_driver_laps(code, array('d', (rng.uniform(70, 95) for _ in range(args.rows // len(CODES)))))
+    results = board.compute_results()
+
+    def dump_whole(path):
+        data = {"location": results.location, "drivers": [
+            {"number": d.number, "name": d.name, "team": d.team, "fastest_lap": d.fastest_lap,
+             "average_lap": d.average_lap, "laps": d.laps.tolist()} for d in results.drivers]}
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=4)
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(None):
+        runs = [
+            ("json.dump of the whole document", lambda: dump_whole(os.path.join(tmp, "a.json"))),
+            ("streaming JSON", lambda: board.export_results_json(os.path.join(tmp, "b.json"), results)),
+            ("streaming JSON Lines", lambda: board.export_results_jsonl(os.path.join(tmp, "c.jsonl"), results)),
+            ("streaming JSON Lines, gzip", lambda: board.export_results_jsonl(
+                os.path.join(tmp, "d.jsonl.gz"), results, compress=True)),
+        ]
+        report = []
+        for label, run in runs:
+            tracemalloc.start()
+            start = time.perf_counter()
+            run()
+            seconds = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            report.append((label, seconds, peak))
+
+    for label, seconds, peak in report:
+        print(f"{label:<32} {seconds:.2f}s, peak {peak / 1e6:.1f} MB")
+
+
+def bench_analytics(args):
+    for rows in args.sizes:
+        rng = random.Random(rows)
+        driver_ids = array('i', (rng.randrange(len(CODES)) for _ in range(rows)))
+        lap_times = array('d', (rng.uniform(70, 95) for _ in range(rows)))
+        backends = [("NumPy", analytics.np)] if analytics.np is not None else []
+        backends.append(("pure Python", None))
+        line = [f"{rows:>11,} laps:"]
+        for label, module in backends:
+            saved, analytics.np = analytics.np, module
+            try:
+                start = time.perf_counter()
+                stats = analytics.grouped_stats(driver_ids, lap_times, len(CODES))
+                analytics.ranking(stats.fastest)
+                seconds = time.perf_counter() - start
+            finally:
+                analytics.np = saved
+            line.append(f"{label} {seconds:.3f}s ({rows / seconds:,.0f} laps/s)")
+        print("  ".join(line))
+        del driver_ids, lap_times
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Timeboard performance benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="parse a large timing file")
+    ingest_parser.add_argument("--rows", type=int, default=10000000)
+    ingest_parser.set_defaults(func=bench_ingest)
+
+    analytics_parser = subparsers.add_parser("analytics", help="grouped per-driver statistics, NumPy vs pure Python")
+    analytics_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 1000000, 50000000])
+    analytics_parser.set_defaults(func=bench_analytics)
+
+    export_parser = subparsers.add_parser("export", help="whole-document vs streaming JSON export")
+    export_parser.add_argument("--rows", type=int, default=2000000)
+    export_parser.set_defaults(func=bench_export)
+
+    store_parser = subparsers.add_parser("store", help="re-parse text laps vs reopen a lap store")
+    store_parser.add_argument("--rows", type=int, default=10000000)
+    store_parser.set_defaults(func=bench_store)
+
+    median_parser = subparsers.add_parser("median", help="overall median of many laps")
+    median_parser.add_argument("--rows", type=int, default=10000000)
+    median_parser.set_defaults(func=bench_median)
+
+    season_parser = subparsers.add_parser("season", help="process many race files serially and in parallel")
+    season_parser.add_argument("--races", type=int, default=100)
+    season_parser.add_argument("--rows", type=int, default=200000)
+    season_parser.add_argument("--workers", type=int, default=None)
+    season_parser.set_defaults(func=bench_season)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from analytics import run_stats, value_counts
+from timing import TimingBoard
+
+# File signature followed by the length of the JSON metadata block
+MAGIC = b"TBLAPS01"
+HEADER = struct.Struct('<8sQ')
+
+# Suffix that marks a timing argument as a lap store rather than a text file
+STORE_SUFFIX = '.laps'
+
+
+def _pad(size):
+    # Padding that keeps the next column 8-byte aligned
+    return -size % 8
+
+
+def write_lap_store(path, groups, lap_numbers=True, session_ids=True):
+    """Write laps to a columnar lap store.
+
+    groups is a list of (session, driver code, lap times) with the laps of
+    one driver in one session. The file holds a small JSON dictionary of
+    driver codes, sessions and group runs, followed by a float64 lap time
+    column, an int32 driver id column and the optional int32 lap number
+    and session id columns. Each group is one contiguous run, so a
+    driver's laps can be sliced out without scanning.
+    """
+    codes = {}
+    sessions = {}
+    runs = []
+    start = 0
+    for session, code, lap_times in groups:
+        driver_id = codes.setdefault(code, len(codes))
+        session_id = sessions.setdefault(session, len(sessions))
+        runs.append([driver_id, session_id, start, len(lap_times)])
+        start += len(lap_times)
+    total = start
+
+    columns = {'lap_times': ('d', 0)}
+    offset = total * 8
+    for name, enabled in (('driver_ids', True), ('lap_numbers', lap_numbers), ('session_ids', session_ids)):
+        if enabled:
+            columns[name] = ('i', offset)
+            offset += total * 4 + _pad(total * 4)
+    metadata = json.dumps({
+        'byteorder': sys.byteorder,
+        'laps': total,
+        'codes': list(codes),
+        'sessions': list(sessions),
+        'runs': runs,
+        'columns': columns,
+    }).encode()
+    metadata += b' ' * _pad(HEADER.size + len(metadata))
+
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, len(metadata)))
+        file.write(metadata)
+        for _, _, lap_times in groups:
+            file.write(lap_times if isinstance(lap_times, (array, memoryview)) else array('d', lap_times))
+        for name in ('driver_ids', 'lap_numbers', 'session_ids'):
+            if name not in columns:
+                continue
+            for driver_id, session_id, _, count in runs:
+                if name == 'driver_ids':
+                    file.write((array('i', [driver_id]) * count).tobytes())
+                elif name == 'session_ids':
+                    file.write((array('i', [session_id]) * count).tobytes())
+                else:
+                    file.write(array('i', range(1, count + 1)).tobytes())
+            file.write(b'\0' * _pad(total * 4))
+
+
+class LapStore:
+    """A lap store reopened through mmap.
+
+    Columns are memoryviews straight onto the mapped file, so opening a
+    store costs only the metadata parse and lap data is paged in by the
+    OS as it is read. Views handed out by the store stay valid for as long
+    as they are referenced.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as file:
+            magic, metadata_size = HEADER.unpack(file.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a lap store")
+            metadata = json.loads(file.read(metadata_size))
+            if metadata['byteorder'] != sys.byteorder:
+                raise ValueError(f"{path} was written on a {metadata['byteorder']}-endian machine")
+            self.data_offset = HEADER.size + metadata_size
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if metadata['laps'] else None
+        self.laps = metadata['laps']
+        self.codes = metadata['codes']
+        self.sessions = metadata['sessions']
+        self.runs = metadata['runs']
+        self.columns = {}
+        for name, (typecode, offset) in metadata['columns'].items():
+            if self.map is None:
+                self.columns[name] = memoryview(array(typecode))
+            else:
+                start = self.data_offset + offset
+                size = self.laps * array(typecode).itemsize
+                self.columns[name] = memoryview(self.map)[start:start + size].cast(typecode)
+
+    def column(self, name):
+        """Return a column as a memoryview, or None if the store was written without it."""
+        return self.columns.get(name)
+
+    def to_boards(self, driver_details=None):
+        """Build one TimingBoard per session whose drivers' lap_times are views into the store.
+
+        Statistics for every run come from one grouped reduction over the
+        lap time column.
+        """
+        lap_times = self.columns['lap_times']
+        runs = [run for run in self.runs if run[3]]
+        stats = run_stats(lap_times, [run[2] for run in runs], [run[3] for run in runs])
+        boards = {}
+        for index, (driver_id, session_id, start, count) in enumerate(runs):
+            board = boards.get(session_id)
+            if board is None:
+                board = boards[session_id] = TimingBoard(location=self.sessions[session_id], keep_laps=False)
+                board.driver_details = driver_details or {}
+            laps = lap_times[start:start + count]
+            driver = board._get_driver(self.codes[driver_id])
+            driver._combine(count, stats.totals[index], stats.fastest[index], stats.slowest[index],
+                            stats.means[index], stats.m2[index])
+            board.lap_distribution.add_counts(value_counts(laps, board.lap_distribution.resolution))
+            if driver.lap_times is None:
+                driver.lap_times = laps
+            else:
+                # A driver split over several runs gets the runs copied together
+                if isinstance(driver.lap_times, memoryview):
+                    driver.lap_times = array('d', driver.lap_times)
+                driver.lap_times.extend(laps)
+        return [boards[session_id] for session_id in sorted(boards)]
@@ -0,0 +1,136 @@
+import os
+import sys
+import time
+from bisect import bisect_left, insort
+
+from timing import parse_lap_time
+
+# Screen rows taken by the title, status line and column headings
+HEADER_ROWS = 4
+
+
+class FileTailer:
+    """Return the complete lines appended to a file since the last read."""
+
+    def __init__(self, path):
+        self.path = path
+        self.offset = 0
+        self.partial = b""
+
+    def read_lines(self):
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return []
+        if size < self.offset:
+            # The file was truncated or replaced, start again from the top
+            self.offset = 0
+            self.partial = b""
+        if size == self.offset:
+            return []
+        with open(self.path, 'rb') as file:
+            file.seek(self.offset)
+            data = file.read(size - self.offset)
+        self.offset += len(data)
+        data, _, self.partial = (self.partial + data).rpartition(b"\n")
+        return data.decode().splitlines() if data else []
+
+
+class LiveBoard:
+    """Standings for a TimingBoard that are updated and redrawn one lap at a time.
+
+    The ranking is a sorted list of (fastest lap, code) keys, so placing a
+    new lap is a binary search. Only the rows between a driver's old and
+    new position are marked dirty, and render() rewrites just the dirty
+    rows whose text actually changed using ANSI cursor positioning.
+    """
+
+    def __init__(self, board, stream=sys.stdout):
+        self.board = board
+        self.stream = stream
+        self.ranking = []
+        self.keys = {}
+        self.rendered = []
+        self.dirty = set()
+        self.total_laps = 0
+        self.bad_lines = 0
+        self.stream.write("\x1b[2J\x1b[H")
+        self.stream.write(f"Formula 1 Grand Prix - {board.location} (live)\n\n")
+        self.stream.write(f"{'Pos':>4} {'Driver':<15} {'Code':<4} {'Best Lap':>9} {'Avg Lap':>9} {'Laps':>6}\n")
+        self.stream.write("=" * 52 + "\n")
+
+    def apply_line(self, line):
+        """Apply one 'CODE,lap_time' line; malformed lines and nan/inf laps are counted and skipped."""
+        try:
+            driver_code, lap_time = line.strip().split(',')
+            lap_time = parse_lap_time(lap_time)
+        except ValueError:
+            if line.strip():
+                self.bad_lines += 1
+            return
+        self.apply(driver_code, lap_time)
+
+    def apply(self, driver_code, lap_time):
+        driver = self.board.add_lap(driver_code, lap_time)
+        self.total_laps += 1
+        key = (driver.fastest_lap, driver_code)
+        old_key = self.keys.get(driver_code)
+        if old_key == key:
+            # Only this driver's average and lap count changed
+            self.dirty.add(bisect_left(self.ranking, key))
+            return
+        if old_key is None:
+            old_position = len(self.ranking)
+        else:
+            old_position = bisect_left(self.ranking, old_key)
+            del self.ranking[old_position]
+        insort(self.ranking, key)
+        self.keys[driver_code] = key
+        new_position = bisect_left(self.ranking, key)
+        self.dirty.update(range(new_position, old_position + 1))
+
+    def _row(self, position):
+        driver = self.board.drivers[self.ranking[position][1]]
+        return (f"{position + 1:>3}. {driver.name:<15} {driver.code:<4} {driver.fastest_lap:>9.3f} "
+                f"{driver.average_lap():>9.3f} {driver.lap_count:>6}")
+
+    def render(self):
+        """Redraw the status line and any standings rows that changed."""
+        out = [f"\x1b[2;1H\x1b[2KLaps: {self.total_laps}  Drivers: {len(self.ranking)}"]
+        if self.bad_lines:
+            out.append(f"  Skipped lines: {self.bad_lines}")
+        for position in sorted(self.dirty):
+            if position >= len(self.ranking):
+                continue
+            text = self._row(position)
+            if position < len(self.rendered):
+                if self.rendered[position] == text:
+                    continue
+                self.rendered[position] = text
+            else:
+                self.rendered.append(text)
+            out.append(f"\x1b[{HEADER_ROWS + position + 1};1H\x1b[2K{text}")
+        self.dirty.clear()
+        # Park the cursor below the table
+        out.append(f"\x1b[{HEADER_ROWS + len(self.ranking) + 1};1H")
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+
+def follow(board, timing_files, interval=0.2, stream=sys.stdout):
+    """Tail the timing files into board, redrawing the standings until Ctrl-C."""
+    live = LiveBoard(board, stream)
+    tailers = [FileTailer(path) for path in timing_files]
+    try:
+        while True:
+            changed = False
+            for tailer in tailers:
+                for line in tailer.read_lines():
+                    live.apply_line(line)
+                    changed = True
+            if changed:
+                live.render()
+            time.sleep(interval)
+    except KeyboardInterrupt:
+        stream.write("\n")
+    return live
@@ -0,0 +1,81 @@
+from bisect import bisect_right
+from collections import Counter
+from itertools import accumulate
+
+
+class LapDistribution:
+    """Mergeable distribution of lap times for medians and percentiles.
+
+    Laps are rounded to resolution seconds (1 ms by default, the precision
+    of the timing files) and counted by that tick, so memory grows with
+    the number of distinct ticks, not the number of laps, even for finer
+    grained telemetry. Quantiles are exact for the rounded laps. The
+    sorted ticks and cumulative counts are rebuilt lazily, only when a
+    quantile is asked for after new laps arrived.
+    """
+
+    def __init__(self, lap_times=(), resolution=0.001):
+        self.resolution = resolution
+        # Ticks per second; dividing by an integer gives the closest float to each tick
+        self.scale = round(1 / resolution)
+        self._to_ticks = float(self.scale).__mul__
+        self.counts = Counter()
+        self.count = 0
+        self._values = None
+        self._cumulative = None
+        self.update(lap_times)
+
+    def _ticks(self, lap_times):
+        # Round every lap to a tick up front, so a bad lap leaves the counts untouched
+        try:
+            return list(map(round, map(self._to_ticks, lap_times)))
+        except (OverflowError, ValueError):
+            raise ValueError("Lap times must be finite") from None
+
+    def add(self, lap_time):
+        self.counts[self._ticks((lap_time,))[0]] += 1
+        self.count += 1
+        self._values = None
+
+    def update(self, lap_times):
+        """Add a sequence of lap times at once; raises ValueError for nan or inf."""
+        self.counts.update(self._ticks(lap_times))
+        self.count += len(lap_times)
+        self._values = None
+
+    def add_counts(self, counts):
+        """Add laps already counted by value (a lap time -> count mapping)."""
+        ticks = self.counts
+        for tick, count in zip(self._ticks(counts), counts.values()):
+            ticks[tick] = ticks.get(tick, 0) + count
+        self.count += sum(counts.values())
+        self._values = None
+
+    def merge(self, other):
+        """Fold another distribution (e.g. another race's) into this one."""
+        if other.scale != self.scale:
+            raise ValueError("Cannot merge lap distributions with different resolutions")
+        self.counts.update(other.counts)
+        self.count += other.count
+        self._values = None
+
+    def _value_at(self, rank):
+        # Tick of the lap at 0-based position rank in sorted order
+        return self._values[bisect_right(self._cumulative, rank)]
+
+    def quantile(self, q):
+        """Return the q-quantile (0 <= q <= 1), interpolating between neighbouring laps."""
+        if not self.count:
+            return None
+        if self._values is None:
+            self._values = sorted(self.counts)
+            self._cumulative = list(accumulate(self.counts[value] for value in self._values))
+        position = q * (self.count - 1)
+        lower = int(position)
+        low_value = self._value_at(lower)
+        if position == lower:
+            return low_value / self.scale
+        return (low_value + (self._value_at(lower + 1) - low_value) * (position - lower)) / self.scale
+
+    def median(self):
+        return self.quantile(0.5)
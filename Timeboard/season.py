@@ -0,0 +1,108 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from lap_store import STORE_SUFFIX, LapStore, write_lap_store
+from timing import TimingBoard
+
+# Points for the top ten places of a race, ranked by fastest lap
+POINTS = (25, 18, 15, 12, 10, 8, 6, 4, 2, 1)
+
+
+def process_race(timing_file, driver_details, keep_laps):
+    """Parse one race file into its own TimingBoard (runs in a worker process)."""
+    race = TimingBoard(location=os.path.splitext(os.path.basename(timing_file))[0], keep_laps=keep_laps)
+    race.driver_details = driver_details
+    race.process_timing_file(timing_file)
+    return race
+
+
+class Season:
+    """Races parsed in parallel into per-race boards and merged into one season board.
+
+    Each timing file is processed in a worker process into its own
+    TimingBoard. The per-race drivers are then folded into board with
+    Driver.merge, so the season board holds the same statistics as if
+    every file had been read into it serially.
+    """
+
+    def __init__(self, board, workers=None):
+        self.board = board
+        self.workers = workers
+        self.races = []
+        self.points = {}
+        self.wins = {}
+
+    def load(self, timing_files):
+        """Load text timing files (in parallel) and lap stores, keeping their order."""
+        text_files = [path for path in timing_files if not path.endswith(STORE_SUFFIX)]
+        if len(text_files) > 1 and self.workers != 1:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                parsed = list(executor.map(process_race, text_files,
+                                           [self.board.driver_details] * len(text_files),
+                                           [self.board.keep_laps] * len(text_files)))
+        else:
+            parsed = [process_race(timing_file, self.board.driver_details, self.board.keep_laps)
+                      for timing_file in text_files]
+        parsed = iter(parsed)
+        for timing_file in timing_files:
+            if timing_file.endswith(STORE_SUFFIX):
+                # Stores are memory-mapped, so they are opened here rather than in a worker
+                for race in LapStore(timing_file).to_boards(self.board.driver_details):
+                    self.add_race(race)
+            else:
+                self.add_race(next(parsed))
+
+    def save_laps(self, path):
+        """Write every race's laps to a lap store that can be passed back in place of the text files."""
+        groups = []
+        for race in self.races:
+            for code, driver in race.drivers.items():
+                if driver.lap_times is None:
+                    raise ValueError("Raw laps were not kept, so they cannot be saved")
+                groups.append((race.location, code, driver.lap_times))
+        write_lap_store(path, groups)
+
+    def add_race(self, race):
+        self.races.append(race)
+        self.board.lap_distribution.merge(race.lap_distribution)
+        for code, driver in race.drivers.items():
+            self.board._get_driver(code).merge(driver)
+            self.points.setdefault(code, 0)
+            self.wins.setdefault(code, 0)
+        for position, driver in enumerate(self.race_ranking(race)):
+            if position < len(POINTS):
+                self.points[driver.code] += POINTS[position]
+            if position == 0:
+                self.wins[driver.code] += 1
+
+    @staticmethod
+    def race_ranking(race):
+        return sorted(race.drivers.values(), key=lambda d: (d.fastest_lap, d.code))
+
+    def standings(self):
+        """Return season drivers ordered by points, then wins, then best lap."""
+        return sorted(self.board.drivers.values(),
+                      key=lambda d: (-self.points[d.code], -self.wins[d.code], d.fastest_lap))
+
+    def display_season(self):
+        """Display each race's fastest laps and points, then the season totals."""
+        if not self.races:
+            return
+        for race in self.races:
+            ranking = self.race_ranking(race)
+            if not ranking:
+                continue
+            print(f"\nRace: {race.location} - Fastest Lap: {ranking[0].name} ({ranking[0].code}) "
+                  f"{ranking[0].fastest_lap:.3f}")
+            for position, driver in enumerate(ranking):
+                points = POINTS[position] if position < len(POINTS) else 0
+                print(f"{position + 1}. {driver.name} ({driver.code}) - {driver.fastest_lap:.3f} - {points} pts")
+
+        print("\nSeason Standings:")
+        print("+-----+----------------+-----------------+--------+------+------------+--------+")
+        print("| Pos | Driver         | Team            | Points | Wins |   Best Lap |   Laps |")
+        print("+=====+================+=================+========+======+============+========+")
+        for position, driver in enumerate(self.standings(), start=1):
+            print(f"| {position:<3} | {driver.name:<14} | {driver.team:<15} | {self.points[driver.code]:<6} | "
+                  f"{self.wins[driver.code]:<4} | {driver.fastest_lap:<10.3f} | {driver.lap_count:<6} |")
+        print("+-----+----------------+-----------------+--------+------+------------+--------+")
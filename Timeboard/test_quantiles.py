@@ -0,0 +1,39 @@
+import unittest
+
+from quantiles import LapDistribution
+
+
+class LapDistributionTest(unittest.TestCase):
+
+    def test_median_of_odd_count(self):
+        self.assertEqual(LapDistribution([1.3, 1.1, 1.2]).median(), 1.2)
+
+    def test_median_of_even_count_interpolates(self):
+        self.assertAlmostEqual(LapDistribution([1.1, 1.2, 1.4, 1.5]).median(), 1.3)
+
+    def test_laps_are_quantised_to_resolution(self):
+        distribution = LapDistribution([1.2341, 1.2339])
+        self.assertEqual(distribution.counts, {1234: 2})
+
+    def test_add_counts_matches_update(self):
+        counted = LapDistribution()
+        counted.add_counts({1.2: 2, 1.5: 1})
+        self.assertEqual(counted.counts, LapDistribution([1.2, 1.5, 1.2]).counts)
+        self.assertEqual(counted.count, 3)
+
+    def test_non_finite_laps_are_rejected(self):
+        distribution = LapDistribution([1.2])
+        for lap_time in (float('inf'), float('-inf'), float('nan')):
+            with self.assertRaises(ValueError):
+                distribution.add(lap_time)
+            with self.assertRaises(ValueError):
+                distribution.update([1.3, lap_time])
+            with self.assertRaises(ValueError):
+                distribution.add_counts({1.3: 1, lap_time: 1})
+        self.assertEqual(distribution.counts, {1200: 1})
+        self.assertEqual(distribution.count, 1)
+        self.assertEqual(distribution.median(), 1.2)
+
+
+if __name__ == '__main__':
+    unittest.main()
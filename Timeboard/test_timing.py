@@ -0,0 +1,115 @@
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+from array import array
+
+import timing
+from timing import TimingBoard
+
+
+class ProcessTimingFileTest(unittest.TestCase):
+    """Malformed lines must be handled the same way whichever parser a block takes."""
+
+    def parse(self, text):
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+            file.write(text)
+        self.addCleanup(os.remove, file.name)
+        board = TimingBoard('Test')
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            board.process_timing_file(file.name)
+        laps = {code: list(driver.lap_times) for code, driver in board.drivers.items()}
+        return laps, output.getvalue()
+
+    def test_clean_lines(self):
+        laps, output = self.parse("VER,1.2\nHAM,1.5\nVER,1.3\n")
+        self.assertEqual(laps, {'VER': [1.2, 1.3], 'HAM': [1.5]})
+        self.assertEqual(output, '')
+
+    def test_extra_comma_balanced_by_missing_comma(self):
+        # As many commas as lines, but not one per line
+        laps, output = self.parse("VER,1.2,1.3\n1.4\nHAM,1.5\n")
+        self.assertEqual(laps, {'HAM': [1.5]})
+        self.assertIn("Error parsing line: VER,1.2,1.3", output)
+
+    def test_mixed_clean_and_malformed_lines(self):
+        laps, output = self.parse("VER,1.2\n\nHAM,1.5\nnot a lap\nVER,fast\nLEC,1.4\nVER,1.3")
+        self.assertEqual(laps, {'VER': [1.2, 1.3], 'HAM': [1.5], 'LEC': [1.4]})
+        self.assertIn("Error parsing line: VER,fast", output)
+
+    def test_whitespace_around_fields(self):
+        laps, _ = self.parse("VER,1.2\r\nHAM,1.5 \n")
+        self.assertEqual(laps, {'VER': [1.2], 'HAM': [1.5]})
+
+    def test_non_finite_laps_are_reported(self):
+        laps, output = self.parse("VER,1.2\nHAM,inf\nVER,nan\nHAM,1.5\n")
+        self.assertEqual(laps, {'VER': [1.2], 'HAM': [1.5]})
+        self.assertIn("Error parsing line: HAM,inf", output)
+        self.assertIn("Error parsing line: VER,nan", output)
+
+    def test_statistics_skip_malformed_lines(self):
+        board = TimingBoard('Test')
+        with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+            file.write("VER,1.2,1.3\n1.4\nHAM,1.5\nHAM,1.7\n")
+        self.addCleanup(os.remove, file.name)
+        with contextlib.redirect_stdout(io.StringIO()):
+            board.process_timing_file(file.name)
+        self.assertEqual(list(board.drivers), ['HAM'])
+        self.assertEqual(board.drivers['HAM'].lap_count, 2)
+        self.assertEqual(board.drivers['HAM'].fastest_lap, 1.5)
+        self.assertEqual(board.lap_distribution.count, 2)
+
+
+class DriverMergeTest(unittest.TestCase):
+
+    def test_merge_references_each_race_laps(self):
+        first, second = timing.Driver('VER', keep_laps=True), timing.Driver('VER', keep_laps=True)
+        first.add_laps(array('d', [1.2, 1.4]))
+        second.add_laps(array('d', [1.3]))
+        season = timing.Driver('VER', keep_laps=True)
+        season.merge(first)
+        season.merge(second)
+        self.assertIs(season.lap_times.runs[0], first.lap_times)
+        self.assertIs(season.lap_times.runs[1], second.lap_times)
+        self.assertEqual(list(season.lap_times), [1.2, 1.4, 1.3])
+        self.assertEqual(season.lap_count, 3)
+
+    def test_merge_drops_laps_when_a_race_did_not_keep_them(self):
+        race = timing.Driver('VER')
+        race.add_lap(1.2)
+        season = timing.Driver('VER', keep_laps=True)
+        season.merge(race)
+        self.assertIsNone(season.lap_times)
+
+
+class WriteJsonTest(unittest.TestCase):
+    """Lap columns are written in chunks but must match json.dump exactly."""
+
+    def test_lap_columns_match_json_dump(self):
+        laps = array('d', [1.5, 0.1, float('nan'), float('inf'), -float('inf')])
+        for indent in (None, 2):
+            output = io.StringIO()
+            timing._write_json(output, {'laps': laps}, indent)
+            separators = (',', ':') if indent is None else None
+            self.assertEqual(output.getvalue(), json.dumps({'laps': list(laps)}, indent=indent, separators=separators))
+
+    def test_lap_runs_match_json_dump(self):
+        runs = timing.LapRuns([array('d', [1.5, 0.1]), memoryview(array('d', [1.2]))])
+        output = io.StringIO()
+        timing._write_json(output, {'laps': runs}, 2)
+        self.assertEqual(output.getvalue(), json.dumps({'laps': [1.5, 0.1, 1.2]}, indent=2))
+
+
+class PurePythonProcessTimingFileTest(ProcessTimingFileTest):
+    """The same cases with NumPy hidden, so clean blocks take the pure Python column parser."""
+
+    def setUp(self):
+        self.addCleanup(setattr, timing, 'np', timing.np)
+        timing.np = None
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,625 @@
+import csv
+import gzip
+import json
+from array import array
+from collections import Counter, deque, namedtuple
+from itertools import chain
+from math import dist, isfinite, sqrt
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; clean blocks are then grouped per driver in Python
+    np = None
+
+from analytics import (best_window_average, detect_stints, gaps_to_leader, grouped_stats, ranking,
+                       split_groups, value_counts)
+from quantiles import LapDistribution
+
+# Bytes read from a timing file at a time
+CHUNK_SIZE = 1 << 22
+
+# Every byte but comma and newline, deleted from a block to see if they alternate (one comma per line)
+NOT_SEPARATORS = bytes(byte for byte in range(256) if byte not in b',\n')
+
+# Raw laps encoded per write, and CSV rows per writerows call, when exporting
+LAP_CHUNK = 65536
+CSV_BATCH = 1000
+
+# Laps in the rolling pace window, and the lap time ratio to the fastest lap
+# above which a lap counts as a pit/outlier lap that ends a stint
+ROLLING_WINDOW = 5
+OUTLIER_RATIO = 1.07
+
+# Per-driver statistics in a results snapshot; laps is None unless raw laps are kept
+DriverResult = namedtuple('DriverResult', ['code', 'number', 'name', 'team', 'fastest_lap', 'average_lap',
+                                           'std_dev', 'lap_count', 'laps'])
+
+# Everything the console table and the exporters render, computed once by compute_results();
+# analysis is a tuple of RaceAnalysis, one per race, or None
+Results = namedtuple('Results', ['location', 'drivers', 'ranking', 'fastest', 'total_laps', 'average_lap',
+                                 'median_lap', 'p10_lap', 'p90_lap', 'most_laps', 'least_laps',
+                                 'most_consistent', 'least_consistent', 'analysis'])
+
+# Lap-by-lap analysis of one driver; rolling_pace is (average, first lap) or None
+DriverAnalysis = namedtuple('DriverAnalysis', ['window', 'rolling_pace', 'stints', 'gaps_to_leader'])
+
+# Lap-by-lap analysis of every driver in one race, {driver code: DriverAnalysis}
+RaceAnalysis = namedtuple('RaceAnalysis', ['location', 'drivers'])
+
+
+def parse_lap_time(text):
+    """Return text as a lap time, raising ValueError unless it is a finite number."""
+    lap_time = float(text)
+    if not isfinite(lap_time):
+        raise ValueError(f"lap time is not finite: {text!r}")
+    return lap_time
+
+
+class LapRuns:
+    """A merged driver's laps, kept as references to each race's lap column rather than copied.
+
+    Races keep their own boards (and lap store views) alive anyway, so a
+    season driver only needs to know which runs make up its laps, in order.
+    """
+
+    __slots__ = ('runs',)
+
+    def __init__(self, runs=()):
+        self.runs = [run for run in runs if len(run)]
+
+    def append_run(self, lap_times):
+        if len(lap_times):
+            self.runs.append(lap_times)
+
+    def __len__(self):
+        return sum(map(len, self.runs))
+
+    def __iter__(self):
+        return chain.from_iterable(self.runs)
+
+
+class Driver:
+    """A driver's lap statistics, kept as O(1) running aggregates.
+
+    Count, sum, fastest and slowest lap and the Welford mean/M2 are
+    updated as laps arrive, so every statistic is constant time. The lap
+    times themselves are only stored when keep_laps is True.
+    """
+
+    __slots__ = ('code', 'name', 'team', 'number', 'lap_times', 'lap_count', 'total_time',
+                 'fastest_lap', 'slowest_lap', '_mean', '_m2')
+
+    def __init__(self, code, name='', team='', number=0, keep_laps=False):
+        self.code = code
+        self.name = name
+        self.team = team
+        self.number = number
+        self.lap_times = array('d') if keep_laps else None
+        self.lap_count = 0
+        self.total_time = 0.0
+        self.fastest_lap = float('inf')
+        self.slowest_lap = float('-inf')
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    def add_lap(self, lap_time):
+        if self.lap_times is not None:
+            self.lap_times.append(lap_time)
+        self.lap_count += 1
+        self.total_time += lap_time
+        if lap_time < self.fastest_lap:
+            self.fastest_lap = lap_time
+        if lap_time > self.slowest_lap:
+            self.slowest_lap = lap_time
+        delta = lap_time - self._mean
+        self._mean += delta / self.lap_count
+        self._m2 += delta * (lap_time - self._mean)
+
+    def add_laps(self, lap_times):
+        """Add a batch of lap times at once."""
+        if not lap_times:
+            return
+        if self.lap_times is not None:
+            self.lap_times.extend(lap_times)
+        count = len(lap_times)
+        total = sum(lap_times)
+        batch_mean = total / count
+        # math.dist is sqrt(sum((lap - mean) ** 2)), summed in C
+        batch_m2 = dist(lap_times, [batch_mean] * count) ** 2
+        self._combine(count, total, min(lap_times), max(lap_times), batch_mean, batch_m2)
+
+    def merge(self, other):
+        """Fold another driver's laps for the same code into this one.
+
+        If other did not keep its laps, this driver's lap list could no
+        longer be complete, so it stops keeping laps too. Otherwise other's
+        laps are referenced in a LapRuns, not copied.
+        """
+        if self.lap_times is not None and other.lap_count:
+            if other.lap_times is None:
+                self.lap_times = None
+            else:
+                if not isinstance(self.lap_times, LapRuns):
+                    self.lap_times = LapRuns([self.lap_times])
+                self.lap_times.append_run(other.lap_times)
+        if other.lap_count:
+            self._combine(other.lap_count, other.total_time, other.fastest_lap, other.slowest_lap,
+                          other._mean, other._m2)
+
+    def _combine(self, count, total, fastest, slowest, batch_mean, batch_m2):
+        # Chan et al. parallel variance update
+        combined = self.lap_count + count
+        delta = batch_mean - self._mean
+        self._m2 += batch_m2 + delta * delta * self.lap_count * count / combined
+        self._mean += delta * count / combined
+        self.lap_count = combined
+        self.total_time += total
+        self.fastest_lap = min(self.fastest_lap, fastest)
+        self.slowest_lap = max(self.slowest_lap, slowest)
+
+    def average_lap(self):
+        return self.total_time / self.lap_count if self.lap_count else 0
+
+    def standard_deviation(self):
+        return sqrt(max(self._m2, 0.0) / (self.lap_count - 1)) if self.lap_count > 1 else 0
+
+
+class _LapGroups(dict):
+    # Lap lists by driver code, created in order of first appearance as they are looked up
+    def __missing__(self, driver_code):
+        laps = self[driver_code] = []
+        return laps
+
+
+class _DriverIds(dict):
+    # Driver code -> id, numbered in order of first appearance as _process_lines creates the drivers
+    def __missing__(self, driver_code):
+        driver_id = self[driver_code] = len(self)
+        return driver_id
+
+
+class TimingBoard:
+    def __init__(self, location, keep_laps=True):
+        self.location = location
+        # Raw laps are only needed for the JSON export
+        self.keep_laps = keep_laps
+        self.drivers = {}
+        self.driver_details = {}
+        # Every lap of the board, for the overall median and percentiles
+        self.lap_distribution = LapDistribution()
+
+    def load_driver_details(self, driver_details_file):
+        """Load driver details from a CSV file."""
+        with open(driver_details_file, 'r') as file:
+            for line in file:
+                try:
+                    # Expecting format: code,name,team,number
+                    code, name, team, number = line.strip().split(',')
+                    self.driver_details[code] = {
+                        'name': name,
+                        'team': team,
+                        'number': int(number)  # Ensure number is an integer
+                    }
+                except ValueError as e:
+                    print(f"Error parsing line: {line}. Error: {e}")
+
+    def process_timing_file(self, timing_file):
+        """Process the lap times for each driver.
+
+        The file is read in large chunks and the laps of each chunk are
+        grouped by driver code, so every driver gets one bulk append per
+        chunk instead of one call per lap.
+        """
+        with open(timing_file, 'r') as file:
+            remainder = ''
+            while True:
+                chunk = file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                # The last line may continue in the next chunk
+                block, newline, remainder = (remainder + chunk).rpartition('\n')
+                if newline:
+                    self._process_block(block)
+            if remainder:
+                self._process_block(remainder)
+
+    def _process_block(self, block):
+        """Parse a block of whole lines.
+
+        A block whose lines are all "CODE,lap" is parsed as columns: with
+        NumPy by _process_columns, otherwise by _process_tokens. Any other
+        block goes through _process_lines, which reports the bad lines.
+        """
+        if ' ' in block or '\r' in block or '\t' in block:
+            self._process_lines(map(str.strip, block.split('\n')))
+        elif not _one_comma_per_line(block):
+            self._process_lines(block.split('\n'))
+        elif not (self._process_columns(block) if np is not None else self._process_tokens(block)):
+            self._process_lines(block.split('\n'))
+
+    def _process_columns(self, block):
+        # Add a block of "CODE,lap" lines as columns; False (and nothing added) if a lap is bad
+        tokens = block.replace('\n', ',').split(',')
+        codes = tokens[0::2]
+        try:
+            lap_times = np.array(tokens[1::2], dtype=np.float64)
+        except ValueError:
+            return False
+        if not np.isfinite(lap_times).all():
+            return False
+        index = _DriverIds()
+        driver_ids = np.fromiter(map(index.__getitem__, codes), dtype=np.intp, count=len(codes))
+        self.add_columns(list(index), driver_ids, lap_times)
+        return True
+
+    def _process_tokens(self, block):
+        # Pure Python counterpart of _process_columns, with no Python-level loop per lap
+        tokens = block.replace('\n', ',').split(',')
+        codes, laps = tokens[0::2], tokens[1::2]
+        # Laps repeat at millisecond resolution, so only the distinct strings are converted
+        counts = Counter(laps)
+        values = {}
+        lap_counts = {}
+        try:
+            for lap_time, count in counts.items():
+                value = values[lap_time] = parse_lap_time(lap_time)
+                lap_counts[value] = lap_counts.get(value, 0) + count
+        except ValueError:
+            return False
+        groups = _LapGroups()
+        deque(map(list.append, map(groups.__getitem__, codes), map(values.__getitem__, laps)), maxlen=0)
+        for driver_code, lap_times in groups.items():
+            self._get_driver(driver_code).add_laps(array('d', lap_times))
+        self.lap_distribution.add_counts(lap_counts)
+        return True
+
+    def _process_lines(self, lines):
+        """Group lap strings by driver code in one pass, then convert and store them in bulk."""
+        grouped = {}
+        for line in lines:
+            driver_code, comma, lap_time = line.partition(',')
+            if not comma:  # Skip lines that don't match the expected format
+                continue
+            laps = grouped.get(driver_code)
+            if laps is None:
+                laps = grouped[driver_code] = []
+            laps.append(lap_time)
+
+        converted = []
+        for driver_code, laps in grouped.items():
+            try:
+                lap_times = array('d', map(float, laps))
+                # A nan or inf lap makes the sum non-finite
+                if not isfinite(sum(lap_times)):
+                    raise ValueError
+            except ValueError:
+                # Fall back to one lap at a time to report the bad lines
+                lap_times = array('d')
+                for lap_time in laps:
+                    try:
+                        lap_times.append(parse_lap_time(lap_time))
+                    except ValueError as e:
+                        print(f"Error parsing line: {driver_code},{lap_time}. Error: {e}")
+            if lap_times:
+                converted.append((driver_code, lap_times))
+        for driver_code, lap_times in converted:
+            self._get_driver(driver_code).add_laps(lap_times)
+        # Counting the whole block first leaves only its distinct laps to round
+        self.lap_distribution.add_counts(Counter(chain.from_iterable(lap_times for _, lap_times in converted)))
+
+    def _get_driver(self, driver_code):
+        driver = self.drivers.get(driver_code)
+        if driver is None:
+            # Create driver if not already present
+            details = self.driver_details.get(driver_code, {})
+            driver = self.drivers[driver_code] = Driver(driver_code, keep_laps=self.keep_laps, **details)
+        return driver
+
+    def _add_driver_laps(self, driver_code, lap_times):
+        if lap_times:
+            self._get_driver(driver_code).add_laps(lap_times)
+            self.lap_distribution.update(lap_times)
+
+    def add_columns(self, codes, driver_ids, lap_times):
+        """Add laps given as flat columns, where driver_ids index into codes.
+
+        Statistics for all drivers come from one grouped reduction over the
+        columns (vectorised when NumPy is installed) instead of a Python
+        loop per lap.
+        """
+        stats = grouped_stats(driver_ids, lap_times, len(codes))
+        split = split_groups(driver_ids, lap_times, len(codes)) if self.keep_laps else None
+        for driver_id, code in enumerate(codes):
+            if not stats.counts[driver_id]:
+                continue
+            driver = self._get_driver(code)
+            if split is not None:
+                driver.lap_times.extend(split[driver_id])
+            driver._combine(stats.counts[driver_id], stats.totals[driver_id], stats.fastest[driver_id],
+                            stats.slowest[driver_id], stats.means[driver_id], stats.m2[driver_id])
+        self.lap_distribution.add_counts(value_counts(lap_times, self.lap_distribution.resolution))
+
+    def add_lap(self, driver_code, lap_time):
+        """Record a single lap and return the driver it belongs to."""
+        driver = self._get_driver(driver_code)
+        driver.add_lap(lap_time)
+        self.lap_distribution.add(lap_time)
+        return driver
+
+    def best_window_average(self, driver_code, window=ROLLING_WINDOW):
+        """Return (average, first lap) of a driver's fastest run of window consecutive laps."""
+        lap_times = self.drivers[driver_code].lap_times
+        return best_window_average(lap_times, window) if lap_times is not None else None
+
+    def stints(self, driver_code, outlier_ratio=OUTLIER_RATIO):
+        """Return a driver's stints, split at laps slower than outlier_ratio x their fastest lap."""
+        lap_times = self.drivers[driver_code].lap_times
+        return detect_stints(lap_times, outlier_ratio) if lap_times is not None else []
+
+    def gaps_to_leader(self):
+        """Return {driver code: [gap to the leader after each lap]} for drivers with raw laps."""
+        return gaps_to_leader({code: driver.lap_times for code, driver in self.drivers.items()
+                               if driver.lap_times is not None})
+
+    def compute_analysis(self, window=ROLLING_WINDOW, outlier_ratio=OUTLIER_RATIO):
+        """Return {driver code: DriverAnalysis}; each part is O(laps)."""
+        gaps = self.gaps_to_leader()
+        return {
+            code: DriverAnalysis(window, self.best_window_average(code, window),
+                                 self.stints(code, outlier_ratio), gaps[code])
+            for code in gaps
+        }
+
+    def compute_results(self, include_analysis=False, races=None):
+        """Build an immutable Results snapshot in one pass over the drivers plus one sort.
+
+        The lap-by-lap analysis needs raw laps and a pass over all of them,
+        so it is only added when include_analysis is True. Gaps, stints and
+        rolling pace only make sense within one race, so they are computed
+        for each board in races (a season's per-race boards), or for this
+        board alone when races is None.
+        """
+        records = []
+        most_laps = least_laps = most_consistent = least_consistent = None
+        total_laps = 0
+        total_time = 0.0
+        for driver in self.drivers.values():
+            record = DriverResult(driver.code, driver.number, driver.name, driver.team, driver.fastest_lap,
+                                  driver.average_lap(), driver.standard_deviation(), driver.lap_count,
+                                  driver.lap_times)
+            records.append(record)
+            total_laps += record.lap_count
+            total_time += driver.total_time
+            # Strict comparisons keep the first driver on ties, like min()/max()
+            if most_laps is None or record.lap_count > most_laps.lap_count:
+                most_laps = record
+            if least_laps is None or record.lap_count < least_laps.lap_count:
+                least_laps = record
+            if record.lap_count > 1:
+                if most_consistent is None or record.std_dev < most_consistent.std_dev:
+                    most_consistent = record
+                if least_consistent is None or record.std_dev > least_consistent.std_dev:
+                    least_consistent = record
+        ranked = tuple(records[i] for i in ranking([record.fastest_lap for record in records]))
+        distribution = self.lap_distribution
+        return Results(
+            location=self.location,
+            drivers=tuple(records),
+            ranking=ranked,
+            fastest=ranked[0] if ranked else None,
+            total_laps=total_laps,
+            average_lap=total_time / total_laps if total_laps else 0,
+            median_lap=distribution.median(),
+            p10_lap=distribution.quantile(0.1),
+            p90_lap=distribution.quantile(0.9),
+            most_laps=most_laps,
+            least_laps=least_laps,
+            most_consistent=most_consistent,
+            least_consistent=least_consistent,
+            analysis=tuple(RaceAnalysis(race.location, race.compute_analysis())
+                           for race in (races if races is not None else [self])) if include_analysis else None,
+        )
+
+    def display_results(self, results=None):
+        """Display results including fastest lap, average lap, etc."""
+        if results is None:
+            results = self.compute_results()
+        if not results.drivers:
+            print("No drivers found. Please check the input files.")
+            return
+
+        print(f"Formula 1 Grand Prix - {results.location}")
+        print("=" * 50)
+
+        fastest_driver = results.fastest
+        print(f"Fastest Lap: {fastest_driver.name} ({fastest_driver.code}) - {fastest_driver.fastest_lap:.3f}")
+        print(f"Overall Average Lap Time: {results.average_lap:.3f}")
+        print(f"Overall Median Lap Time: {results.median_lap:.3f}")
+        print(f"Lap Time Percentiles: P10 {results.p10_lap:.3f}, P90 {results.p90_lap:.3f}")
+
+        most_laps_driver = results.most_laps
+        print(f"Driver with Most Laps: {most_laps_driver.name} ({most_laps_driver.code}) - {most_laps_driver.lap_count} laps")
+
+        least_laps_driver = results.least_laps
+        print(f"Driver with Least Laps: {least_laps_driver.name} ({least_laps_driver.code}) - {least_laps_driver.lap_count} laps")
+
+        most_consistent_driver = results.most_consistent
+        least_consistent_driver = results.least_consistent
+        if most_consistent_driver and least_consistent_driver:
+            print(f"Most Consistent Driver: {most_consistent_driver.name} ({most_consistent_driver.code}) "
+                  f"with std dev {most_consistent_driver.std_dev:.3f}")
+            print(f"Least Consistent Driver: {least_consistent_driver.name} ({least_consistent_driver.code}) "
+                  f"with std dev {least_consistent_driver.std_dev:.3f}")
+
+        print("\nDriver Rankings (Fastest Lap):")
+        for rank, driver in enumerate(results.ranking, start=1):
+            print(f"{rank}. {driver.name} ({driver.code}) - {driver.fastest_lap:.3f}")
+
+        print("\nDetailed Results:")
+        print("+-----+----------------+-----------------+------------+-----------+-----------+--------+-----------+")
+        print("|   # | Driver         | Team            |   Best Lap |   Avg Lap |   Std Dev |   Laps | Notes     |")
+        print("+=====+================+=================+============+===========+===========+========+===========+")
+        for driver in results.ranking:
+            highlight = ""
+            if driver.code == fastest_driver.code:
+                highlight = "*Fastest*"
+            table_data = [
+                driver.number,
+                driver.name,
+                driver.team,
+                f"{driver.fastest_lap:.3f}",
+                f"{driver.average_lap:.3f}",
+                f"{driver.std_dev:.3f}",
+                driver.lap_count,
+                highlight
+            ]
+            print(f"| {table_data[0]:<3} | {table_data[1]:<15} | {table_data[2]:<15} | {table_data[3]:<10} | "
+                  f"{table_data[4]:<9} | {table_data[5]:<9} | {table_data[6]:<6} | {table_data[7]:<9} |")
+        print("+-----+----------------+-----------------+------------+-----------+-----------+--------+-----------+")
+
+    @staticmethod
+    def _driver_record(driver, results, include_laps, compact=False):
+        record = {
+            "number": driver.number,
+            "name": driver.name,
+            "team": driver.team,
+            "fastest_lap": driver.fastest_lap,
+            "average_lap": driver.average_lap,
+        }
+        if compact:
+            record["code"] = driver.code
+            record["lap_count"] = driver.lap_count
+        if include_laps and driver.laps is not None:
+            record["laps"] = driver.laps
+        if results.analysis is not None:
+            races = record["races"] = []
+            for race in results.analysis:
+                analysis = race.drivers.get(driver.code)
+                if analysis is None:
+                    continue
+                pace = analysis.rolling_pace
+                entry = {
+                    "location": race.location,
+                    "rolling_pace": None if pace is None else {
+                        "window": analysis.window, "average": pace[0], "start_lap": pace[1]},
+                    "stints": [stint._asdict() for stint in analysis.stints],
+                }
+                if include_laps:
+                    entry["gaps_to_leader"] = analysis.gaps_to_leader
+                races.append(entry)
+        return record
+
+    def export_results_json(self, output_file, results=None, include_laps=True, compress=False):
+        """Export results to a JSON file, streaming one driver at a time.
+
+        The output matches json.dump(..., indent=4) of the whole document,
+        but records are encoded one by one and raw laps are written in
+        chunks, so memory stays flat however many laps there are. With
+        analysis, each driver has a "races" list with the analysis of
+        every race they drove in.
+        """
+        if results is None:
+            results = self.compute_results()
+        with _open_export(output_file, compress) as f:
+            f.write('{\n    "location": ' + json.dumps(results.location) + ',\n    "drivers": [')
+            separator = "\n"
+            for driver in results.drivers:
+                f.write(separator + "        ")
+                separator = ",\n"
+                _write_json(f, self._driver_record(driver, results, include_laps), 4, "        ")
+            f.write("\n    ]\n}" if results.drivers else "]\n}")
+        print(f"Results exported to {output_file}")
+
+    def export_results_jsonl(self, output_file, results=None, include_laps=True, compress=False):
+        """Export one compact JSON object per driver per line."""
+        if results is None:
+            results = self.compute_results()
+        with _open_export(output_file, compress) as f:
+            for driver in results.drivers:
+                _write_json(f, self._driver_record(driver, results, include_laps, compact=True))
+                f.write('\n')
+        print(f"Results exported to {output_file}")
+
+    def export_results_csv(self, output_file, results=None, compress=False):
+        """Export results to a CSV file, writing rows in batches.
+
+        With analysis, every race adds a best rolling average and a stint
+        count column, left empty for drivers who were not in that race.
+        """
+        if results is None:
+            results = self.compute_results()
+        races = results.analysis or ()
+        with _open_export(output_file, compress) as csvfile:
+            writer = csv.writer(csvfile)
+            header = ['Driver', 'Team', 'Fastest Lap', 'Average Lap', 'Laps']
+            for race in races:
+                header += [f'{race.location} Best {ROLLING_WINDOW}-Lap Average', f'{race.location} Stints']
+            writer.writerow(header)
+            for start in range(0, len(results.drivers), CSV_BATCH):
+                rows = []
+                for driver in results.drivers[start:start + CSV_BATCH]:
+                    row = [driver.name, driver.team, driver.fastest_lap, driver.average_lap, driver.lap_count]
+                    for race in races:
+                        analysis = race.drivers.get(driver.code)
+                        pace = analysis.rolling_pace if analysis else None
+                        row += [pace[0] if pace else '', len(analysis.stints) if analysis else '']
+                    rows.append(row)
+                writer.writerows(rows)
+        print(f"Results exported to {output_file}")
+
+
+def _one_comma_per_line(block):
+    # The separators left must run ",\n,\n...," for every line to have exactly one comma
+    separators = block.encode().translate(None, NOT_SEPARATORS)
+    return len(separators) % 2 == 1 and b'\n' not in separators[0::2] and b',' not in separators[1::2]
+
+
+def _write_json(f, value, indent=None, pad=""):
+    # json.dump(value, f, indent=indent) (compact separators without indent),
+    # with lap columns (arrays, memoryviews and LapRuns) encoded in chunks
+    columns = isinstance(value, (array, memoryview, LapRuns))
+    if not isinstance(value, (dict, list, tuple)) and not columns:
+        f.write(json.dumps(value))
+        return
+    opening, closing = ('{', '}') if isinstance(value, dict) else ('[', ']')
+    if not len(value):
+        f.write(opening + closing)
+        return
+    inner = pad if indent is None else pad + " " * indent
+    separator = "," if indent is None else ",\n" + inner
+    f.write(opening if indent is None else opening + "\n" + inner)
+    if columns:
+        for index, run in enumerate(value.runs if isinstance(value, LapRuns) else [value]):
+            if index:
+                f.write(separator)
+            _write_numbers(f, run, separator)
+    elif isinstance(value, dict):
+        key_separator = ":" if indent is None else ": "
+        for index, (key, item) in enumerate(value.items()):
+            f.write((separator if index else "") + json.dumps(key) + key_separator)
+            _write_json(f, item, indent, inner)
+    else:
+        for index, item in enumerate(value):
+            if index:
+                f.write(separator)
+            _write_json(f, item, indent, inner)
+    f.write(closing if indent is None else "\n" + pad + closing)
+
+
+def _write_numbers(f, values, separator):
+    # Encode a long list of floats in chunks rather than all at once. repr matches
+    # json.dumps for finite floats; a chunk holding nan or inf (non-finite sum)
+    # goes through json.dumps so they come out as NaN/Infinity like json.dump
+    for start in range(0, len(values), LAP_CHUNK):
+        if start:
+            f.write(separator)
+        chunk = values[start:start + LAP_CHUNK]
+        encode = repr if isfinite(sum(chunk)) else json.dumps
+        f.write(separator.join(map(encode, chunk)))
+
+
+def _open_export(output_file, compress):
+    """Open an export file for text writing, gzip-compressed if asked."""
+    if compress:
+        return gzip.open(output_file, 'wt', newline='')
+    return open(output_file, 'w', newline='')